@@ -7,8 +7,8 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QWidget,
     QLabel,
-    QTableWidget,
-    QTableWidgetItem,
+    QHeaderView,
+    QTableView,
     QTabWidget,
     QDialog,
     QLineEdit,
@@ -16,18 +16,1449 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QDialogButtonBox,
     QComboBox,
-    QListWidget,
+    QMenu,
+    QListView,
     QGridLayout,
+    QGroupBox,
     QCompleter,
 )
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QDateTime, Qt
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QAbstractTableModel,
+    QDate,
+    QDateTime,
+    QModelIndex,
+    QTime,
+    QSortFilterProxyModel,
+    Qt,
+    QThread,
+    QTimer,
+    pyqtSignal,
+)
 import openpyxl
 from openpyxl import Workbook
 import resources_rc
+from abc import ABC, abstractmethod
+import bisect
+import glob
+import heapq
+from collections import namedtuple
+import json
 import os
+import queue
+import sqlite3
+import time
+import uuid
+
+# The lounge layout is read from this file, which is created with the
+# original 16-PC room the first time the app runs
+LAYOUT_FILE = "lounge_layout.json"
+
+# One PC in the lounge: the number it is logged under, the text on its
+# button, the zone it sits in and its cell in that zone's grid
+Seat = namedtuple("Seat", ["number", "label", "zone", "row", "column"])
+
+
+def default_layout():
+    # Four rows of three, then a row of four
+    pcs = []
+    for i, number in enumerate([16, 15, 14, 11, 12, 13, 10, 9, 8, 5, 6, 7, 4, 3, 2, 1]):
+        row, column = divmod(i, 3) if i < 12 else (4, i - 12)
+        pcs.append({"number": number, "row": row, "column": column})
+    return {"zones": [{"name": "Lounge", "pcs": pcs}]}
+
+
+def load_layout(path=LAYOUT_FILE):
+    # The file holds a list of zones. Each zone has a name and its PCs, and a
+    # PC is either {"number", "label", "row", "column"} or just its number,
+    # in which case it takes the next cell of a grid "columns" wide.
+    # Seats are returned in file order.
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            json.dump(default_layout(), f, indent=2)
+    with open(path) as f:
+        layout = json.load(f)
+
+    seats = []
+    numbers = set()
+    for zone in layout["zones"]:
+        name = zone.get("name", "")
+        cells = set()
+        for i, pc in enumerate(zone["pcs"]):
+            if not isinstance(pc, dict):
+                pc = {"number": pc}
+            if "row" in pc:
+                cell = (pc["row"], pc["column"])
+            elif "columns" in zone:
+                cell = divmod(i, zone["columns"])
+            else:
+                raise ValueError(f"{path}: PC {pc['number']} has no row and zone {name!r} has no columns")
+            if pc["number"] in numbers:
+                raise ValueError(f"{path}: PC {pc['number']} appears more than once")
+            if cell in cells:
+                raise ValueError(f"{path}: two PCs share row {cell[0]}, column {cell[1]} in zone {name!r}")
+            numbers.add(pc["number"])
+            cells.add(cell)
+            label = pc.get("label", f"PC {pc['number']}")
+            seats.append(Seat(pc["number"], label, name, cell[0], cell[1]))
+    return seats
+
+
+# Orders in which free PCs are handed out, as a rank for each PC number.
+# fill-front goes in layout order; spread-out takes alternate seats, like
+# the dark squares of a checkerboard, before filling in the rest, so
+# neighbours stay apart while the lounge is quiet.
+def fill_front_ranks(seats):
+    return {seat.number: i for i, seat in enumerate(seats)}
+
+
+def spread_out_ranks(seats):
+    return {seat.number: ((seat.row + seat.column) % 2, i) for i, seat in enumerate(seats)}
+
+
+# Until a session has ended today, waits are estimated as if sessions
+# last this long
+DEFAULT_SESSION_MINUTES = 60
+
+# Selected with the PCLOUNGE_SEAT_PREFERENCE environment variable
+SEAT_PREFERENCES = {"fill-front": fill_front_ranks, "spread-out": spread_out_ranks}
+SEAT_PREFERENCE = os.environ.get("PCLOUNGE_SEAT_PREFERENCE", "fill-front")
+
+
+class FreeSeatPool:
+    # The PCs that are free right now, best first by rank. A heap of
+    # (rank, PC number) with lazy removal: a PC that stops being free stays
+    # in the heap until it reaches the top, where peek drops it.
+    def __init__(self, ranks):
+        self.ranks = ranks
+        self.free = set()
+        self.heap = []
+
+    def add(self, pc_number):
+        if pc_number in self.free:
+            return
+        self.free.add(pc_number)
+        heapq.heappush(self.heap, (self.ranks[pc_number], pc_number))
+        if len(self.heap) > 2 * len(self.ranks):
+            # Too many stale entries; start over from what is free
+            self.heap = [(self.ranks[pc], pc) for pc in self.free]
+            heapq.heapify(self.heap)
+
+    def discard(self, pc_number):
+        self.free.discard(pc_number)
+
+    def peek(self):
+        while self.heap and self.heap[0][1] not in self.free:
+            heapq.heappop(self.heap)
+        return self.heap[0][1] if self.heap else None
+
+    def __contains__(self, pc_number):
+        return pc_number in self.free
+
+    def __len__(self):
+        return len(self.free)
+
+
+# Button colour for each state a PC can be in. A PC is restyled by setting
+# its "state" property; the rules for every state are generated from this
+# palette into the application stylesheet once, at startup.
+PC_STATE_COLORS = {
+    "Free": "lightgreen",
+    "In Use": "lightcoral",
+    "Reserved": "khaki",
+    "Out of Order": "darkgray",
+}
+
+
+def pc_state_stylesheet():
+    return "".join(
+        f'QPushButton[state="{state}"] {{ background-color: {color}; font-size: 16px; padding: 10px; }}\n'
+        for state, color in PC_STATE_COLORS.items()
+    )
+
+
+# Saves of a workbook are batched: changes are collected for up to
+# WRITE_FLUSH_INTERVAL_MS, or until WRITE_FLUSH_MAX_EVENTS have queued up,
+# and then written with a single save
+WRITE_FLUSH_INTERVAL_MS = 500
+WRITE_FLUSH_MAX_EVENTS = 20
+
+# The roster is loaded this many members at a time, one batch per pass of
+# the event loop, so the window stays responsive on large rosters
+MEMBER_LOAD_CHUNK_SIZE = 500
+
+# Times are kept as integer epoch seconds and only rendered as text for
+# display and for the workbooks
+TIME_FORMAT = "yyyy-MM-dd hh:mm:ss"
+
+
+def format_time(epoch):
+    return QDateTime.fromSecsSinceEpoch(epoch).toString(TIME_FORMAT)
+
+
+def format_wait(seconds):
+    if seconds < 60:
+        return "any moment now"
+    return f"about {seconds // 60} min"
+
+
+def parse_time(text):
+    # Only for importing a log workbook written before the journal existed
+    return QDateTime.fromString(text, TIME_FORMAT).toSecsSinceEpoch()
+
+
+SIGN_IN = "Sign-In"
+SIGN_OUT = "Sign-Out"
+
+# One sign-in or sign-out. This is what flows between the PC grid, the event
+# table and storage; time is epoch seconds and action is SIGN_IN or SIGN_OUT.
+Event = namedtuple("Event", ["time", "pc_number", "student_id", "name", "action"])
+
+# A session still open at midnight is signed out at the end of its day's
+# log and continues on a new row at the start of the next day's, marked
+# "Yes" under Continued. The session belongs to the day it started on; each
+# day's log holds only the time used that day.
+LOG_HEADER = ["Name", "Student ID", "Sign-In Time", "PC Number", "Sign-Out Time", "Continued"]
+MEMBER_HEADER = ["Student ID", "Name"]
+
+
+def atomic_save(wb, path):
+    # Save to a temporary file, fsync it and rename it over path, so a crash
+    # mid-save leaves the previous file intact instead of a truncated one
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        wb.save(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def remove_stale_temp(path):
+    # Left behind by a save that never got to its rename
+    if os.path.exists(path + ".tmp"):
+        os.remove(path + ".tmp")
+
+
+class Journal:
+    # Append-only record of changes, one JSON object per line, each fsync'd
+    # before returning. The day's sign-ins and sign-outs are kept this way
+    # as the system of record for the .xlsx log, and roster changes are kept
+    # this way until the roster workbook has been saved with them.
+    def __init__(self, path):
+        self.path = path
+        self.repair()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def repair(self):
+        # Drop a partially written last line left behind by a crash
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        self.file.write("".join(json.dumps(record) + "\n" for record in records))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def replay(self):
+        return self.read(self.path)
+
+    @staticmethod
+    def read(path):
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records.append(record)
+        return records
+
+    @staticmethod
+    def events(records):
+        # An Event for every sign-in and sign-out, in time order
+        sign_ins = {}
+        events = []
+        for record in records:
+            if record["op"] == "sign_in":
+                sign_in = sign_ins[record["session"]] = record
+                if record.get("carried"):
+                    # Signed in on an earlier day, still open at midnight
+                    continue
+                action = SIGN_IN
+            elif record["op"] == "sign_out":
+                sign_in = sign_ins[record["session"]]
+                if record.get("carried"):
+                    # Closed at midnight, continued in the next day's log
+                    continue
+                action = SIGN_OUT
+            else:
+                continue
+            events.append(
+                Event(
+                    record["time"],
+                    sign_in["pc"],
+                    sign_in["student_id"],
+                    sign_in["name"],
+                    action,
+                )
+            )
+        # Sign-outs logged after the fact, when restoring sessions, come
+        # after later events; the sort is stable, so it costs next to nothing
+        # otherwise
+        events.sort(key=lambda event: event.time)
+        return events
+
+    def clear(self):
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class WorkbookWriter(QThread):
+    # Saves workbooks off the GUI thread. Callers queue row operations; the
+    # thread keeps its own copy of each sheet, collects operations for one
+    # flush window and then saves every touched file once.
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+
+    def __init__(
+        self,
+        parent=None,
+        flush_interval_ms=WRITE_FLUSH_INTERVAL_MS,
+        flush_max_events=WRITE_FLUSH_MAX_EVENTS,
+    ):
+        super().__init__(parent)
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_events = flush_max_events
+        self.operations = queue.Queue()
+        self.sheets = {}
+        self.unsaved = set()  # Paths whose last save failed
+
+    @staticmethod
+    def copy_rows(rows):
+        # Row lists are copied too; callers keep changing their own
+        return {key: list(row) for key, row in dict(rows).items()}
+
+    def open_sheet(self, path, title, header, rows, save=True):
+        self.operations.put(("open", path, (title, header, self.copy_rows(rows), save)))
+
+    def export_sheet(self, path, title, header, rows):
+        # Like open_sheet, but the copy is dropped again once it is saved
+        self.operations.put(("export", path, (title, header, self.copy_rows(rows), True)))
+
+    def close_sheet(self, path):
+        # Drops the in-memory copy once everything queued for path is saved
+        self.operations.put(("close", path, None))
+
+    def append_row(self, path, key, row):
+        self.operations.put(("append", path, (key, list(row))))
+
+    def set_cell(self, path, key, column, value):
+        self.operations.put(("set", path, (key, column, value)))
+
+    def delete_rows(self, path, keys):
+        # Rows are dropped from the in-memory sheet right away; the file is
+        # compacted by the next save
+        self.operations.put(("delete", path, list(keys)))
+
+    def flush(self):
+        # Ends the current flush window early
+        self.operations.put(("flush", None, None))
+
+    def stop(self):
+        # Flushes whatever is still queued before the thread exits
+        self.operations.put(None)
+        self.wait()
+
+    def collect(self):
+        # Block for the first operation, then keep collecting until the flush
+        # window closes, enough operations have queued up, or a flush/stop
+        # is requested
+        pending = [self.operations.get()]
+        deadline = time.monotonic() + self.flush_interval_ms / 1000
+        while len(pending) < self.flush_max_events:
+            if pending[-1] is None or pending[-1][0] == "flush":
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self.operations.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            touched = []
+            released = []
+            for operation in self.collect():
+                if operation is None:
+                    stopping = True
+                    continue
+                kind, path, args = operation
+                if kind == "flush":
+                    continue
+                if kind == "close":
+                    released.append(path)
+                    continue
+                if kind == "export":
+                    released.append(path)
+                try:
+                    if not self.apply(kind, path, args):
+                        continue
+                except Exception as e:
+                    # A bad operation must not take the thread down with
+                    # it; report it and carry on with the rest
+                    self.failed.emit(path, f"{kind}: {e!r}")
+                    continue
+                if path not in touched:
+                    touched.append(path)
+
+            for path in touched:
+                try:
+                    self.save_sheet(path)
+                except Exception as e:
+                    self.unsaved.add(path)
+                    self.failed.emit(path, str(e))
+                else:
+                    self.unsaved.discard(path)
+                    self.saved.emit(path)
+
+            for path in released:
+                self.sheets.pop(path, None)
+
+    def apply(self, kind, path, args):
+        # Returns whether the sheet needs saving afterwards
+        if kind in ("open", "export"):
+            title, header, rows, save = args
+            self.sheets[path] = {"title": title, "header": header, "rows": rows}
+            return save
+        if kind == "append":
+            key, row = args
+            self.sheets[path]["rows"][key] = row
+        elif kind == "set":
+            key, column, value = args
+            self.sheets[path]["rows"][key][column] = value
+        elif kind == "delete":
+            rows = self.sheets[path]["rows"]
+            for key in args:
+                rows.pop(key, None)
+        return True
+
+    def save_sheet(self, path):
+        sheet = self.sheets[path]
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet["title"])
+        ws.append(sheet["header"])
+        for row in sheet["rows"].values():
+            ws.append(row)
+        atomic_save(wb, path)
+        wb.close()
+
+
+class MemberSearchIndex:
+    # Search over the casefolded "Name (ID)" text of every member, kept up to
+    # date as members are added and removed. A sorted list of the text from
+    # each word start on finds names, surnames and IDs by prefix with a
+    # bisect, and a trigram index finds text anywhere else without scanning
+    # the roster. For typos, every word is also filed under each spelling
+    # with one letter deleted: two words within one typo of each other
+    # always share one of these.
+    def __init__(self):
+        self.texts = {}  # Student ID -> casefolded display text
+        self.postings = {}  # Trigram -> student IDs whose text contains it
+        self.words = []  # (Text from a word start on, student ID)
+        self.words_sorted = True
+        self.word_ids = {}  # Word -> student IDs with that word
+        self.deletions = {}  # Word with one letter deleted -> words
+
+    @staticmethod
+    def split_words(text):
+        return text.replace("(", " ").replace(")", " ").split()
+
+    @staticmethod
+    def with_one_deleted(word):
+        return {word[:i] + word[i + 1 :] for i in range(len(word))} | {word}
+
+    @staticmethod
+    def one_typo_apart(a, b):
+        # A letter missed, added or changed, or two neighbours swapped
+        if len(a) > len(b):
+            a, b = b, a
+        if len(b) - len(a) > 1:
+            return False
+        i = 0
+        while i < len(a) and a[i] == b[i]:
+            i += 1
+        if len(a) < len(b):
+            return a[i:] == b[i + 1 :]
+        return (
+            a[i + 1 :] == b[i + 1 :]
+            or (a[i : i + 2] == b[i : i + 2][::-1] and a[i + 2 :] == b[i + 2 :])
+        )
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i : i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def word_starts(text):
+        return [i for i in range(len(text)) if i == 0 or text[i - 1] in " ("]
+
+    def add(self, student_id, text):
+        text = text.casefold()
+        self.texts[student_id] = text
+        for trigram in self.trigrams(text):
+            self.postings.setdefault(trigram, set()).add(student_id)
+        for start in self.word_starts(text):
+            self.words.append((text[start:], student_id))
+        self.words_sorted = False
+        for word in self.split_words(text):
+            if word not in self.word_ids:
+                self.word_ids[word] = set()
+                for deleted in self.with_one_deleted(word):
+                    self.deletions.setdefault(deleted, set()).add(word)
+            self.word_ids[word].add(student_id)
+
+    def remove(self, student_id):
+        text = self.texts.pop(student_id, None)
+        if text is None:
+            return
+        for trigram in self.trigrams(text):
+            ids = self.postings[trigram]
+            ids.discard(student_id)
+            if not ids:
+                del self.postings[trigram]
+        words = self.sorted_words()
+        for start in self.word_starts(text):
+            del words[bisect.bisect_left(words, (text[start:], student_id))]
+        for word in set(self.split_words(text)):
+            ids = self.word_ids[word]
+            ids.discard(student_id)
+            if not ids:
+                del self.word_ids[word]
+                for deleted in self.with_one_deleted(word):
+                    words_with = self.deletions[deleted]
+                    words_with.discard(word)
+                    if not words_with:
+                        del self.deletions[deleted]
+
+    def sorted_words(self):
+        # Sorted when next needed rather than on every add, so loading the
+        # roster sorts once
+        if not self.words_sorted:
+            self.words.sort()
+            self.words_sorted = True
+        return self.words
+
+    def search(self, query, limit, fuzzy=False):
+        # Up to limit student IDs, best first: members with a word starting
+        # with query, then members with query anywhere, earliest first. With
+        # fuzzy, a query that matches nobody falls back to members with
+        # words within one typo of the query's, and failing that to those
+        # sharing most of its trigrams.
+        query = query.strip().casefold()
+        if not query:
+            return []
+
+        results = []
+        found = set()
+        words = self.sorted_words()
+        i = bisect.bisect_left(words, (query,))
+        while i < len(words) and len(results) < limit and words[i][0].startswith(query):
+            student_id = words[i][1]
+            if student_id not in found:
+                found.add(student_id)
+                results.append(student_id)
+            i += 1
+        if len(results) == limit:
+            return results
+
+        wanted = limit - len(results)
+        matches = []
+        if len(query) < 3:
+            # Too short for the trigram index, but a query this short matches
+            # so many members that a scan finds enough almost immediately
+            for student_id, text in self.texts.items():
+                position = text.find(query)
+                if position >= 0 and student_id not in found:
+                    matches.append((position, text, student_id))
+                    if len(matches) == wanted:
+                        break
+        else:
+            postings = sorted(
+                (self.postings.get(trigram, set()) for trigram in self.trigrams(query)),
+                key=len,
+            )
+            for student_id in postings[0].intersection(*postings[1:]):
+                text = self.texts[student_id]
+                position = text.find(query)
+                if position >= 0 and student_id not in found:
+                    matches.append((position, text, student_id))
+        results.extend(match[2] for match in heapq.nsmallest(wanted, matches))
+
+        if fuzzy and not results:
+            results = self.close_matches(query, limit) or self.similar(query, limit)
+        return results
+
+    def close_matches(self, query, limit):
+        # Members matching every word of the query, where a word matches if
+        # one of theirs starts with it or is within one typo of it
+        candidates = None
+        for query_word in self.split_words(query):
+            ids = set()
+            words = self.sorted_words()
+            i = bisect.bisect_left(words, (query_word,))
+            while i < len(words) and words[i][0].startswith(query_word):
+                ids.add(words[i][1])
+                i += 1
+            if len(query_word) >= 3:
+                for deleted in self.with_one_deleted(query_word):
+                    for word in self.deletions.get(deleted, ()):
+                        if self.one_typo_apart(query_word, word):
+                            ids |= self.word_ids[word]
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        return heapq.nsmallest(limit, candidates or (), key=self.texts.__getitem__)
+
+    def similar(self, query, limit):
+        # Members sharing at least half of the query's trigrams, most shared
+        # first; one typo spoils at most three of them
+        trigrams = self.trigrams(query)
+        threshold = max(2, len(trigrams) // 2)
+        if len(trigrams) < threshold:
+            return []
+        postings = sorted(
+            (self.postings.get(trigram, set()) for trigram in trigrams), key=len
+        )
+        # Anyone sharing threshold trigrams has one of the rarest few, so
+        # only those need counting
+        candidates = set().union(*postings[: len(postings) - threshold + 1])
+        matches = []
+        for student_id in candidates:
+            shared = sum(student_id in ids for ids in postings)
+            if shared >= threshold:
+                matches.append((-shared, self.texts[student_id], student_id))
+        return [match[2] for match in heapq.nsmallest(limit, matches)]
+
+
+class MemberRegistry:
+    # The club roster kept in memory, keyed by student ID, with an index on
+    # the "Name (ID)" text shown in the UI and a search index. Built once at
+    # startup and updated as members are added and deleted.
+    def __init__(self):
+        self.names = {}
+        self.ids_by_display = {}
+        self.search_index = MemberSearchIndex()
+
+    @staticmethod
+    def display(student_id, name):
+        return f"{name} ({student_id})"
+
+    def add(self, student_id, name):
+        student_id = str(student_id)
+        name = str(name)
+        self.remove(student_id)
+        self.names[student_id] = name
+        self.ids_by_display[self.display(student_id, name)] = student_id
+        self.search_index.add(student_id, self.display(student_id, name))
+        return student_id
+
+    def remove(self, student_id):
+        name = self.names.pop(student_id, None)
+        if name is None:
+            return
+        del self.ids_by_display[self.display(student_id, name)]
+        self.search_index.remove(student_id)
+
+    def name(self, student_id):
+        return self.names.get(student_id)
+
+    def find_by_display(self, text):
+        return self.ids_by_display.get(text.strip())
+
+    def search(self, text, limit, fuzzy=False):
+        return self.search_index.search(text, limit, fuzzy)
+
+    def __contains__(self, student_id):
+        return student_id in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+
+class MemberListModel(QAbstractListModel):
+    # List model over a MemberRegistry, in roster order. Rows are handed to
+    # the view a page at a time through fetchMore, so only what has been
+    # scrolled to is ever laid out.
+    page_size = 200
+
+    def __init__(self, members, parent=None):
+        super().__init__(parent)
+        self.members = members
+        self.student_ids = []
+        self.fetched = 0
+
+    def set_registry(self, members):
+        self.beginResetModel()
+        self.members = members
+        self.student_ids = []
+        self.fetched = 0
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.fetched
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        student_id = self.student_ids[index.row()]
+        if role == Qt.DisplayRole:
+            return MemberRegistry.display(student_id, self.members.name(student_id))
+        if role == Qt.UserRole:
+            return student_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.fetched < len(self.student_ids)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.page_size, len(self.student_ids) - self.fetched)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        # Searching has to see the whole roster, not just the fetched pages
+        if self.fetched < len(self.student_ids):
+            self.beginInsertRows(QModelIndex(), self.fetched, len(self.student_ids) - 1)
+            self.fetched = len(self.student_ids)
+            self.endInsertRows()
+
+    def append(self, student_ids):
+        # New members become visible when the view fetches them, or right
+        # away if everything before them has been fetched already
+        fully_fetched = self.fetched == len(self.student_ids)
+        self.student_ids.extend(student_ids)
+        if fully_fetched:
+            self.fetchMore()
+
+    def remove(self, student_ids):
+        student_ids = set(student_ids)
+        rows = [
+            row
+            for row, student_id in enumerate(self.student_ids)
+            if student_id in student_ids
+        ]
+        for row in reversed(rows):
+            if row < self.fetched:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.student_ids[row]
+                self.fetched -= 1
+                self.endRemoveRows()
+            else:
+                del self.student_ids[row]
+
+
+class MemberCompletionModel(QAbstractListModel):
+    # Completions for the text typed so far, looked up in the registry's
+    # search index. Meant for a QCompleter in UnfilteredPopupCompletion mode,
+    # which shows these rows as they are instead of filtering a whole roster.
+    limit = 50
+    fuzzy = True
+
+    def __init__(self, members, parent=None):
+        super().__init__(parent)
+        self.members = members
+        self.student_ids = []
+
+    def set_registry(self, members):
+        self.beginResetModel()
+        self.members = members
+        self.student_ids = []
+        self.endResetModel()
+
+    def search(self, text):
+        self.beginResetModel()
+        self.student_ids = self.members.search(text, self.limit, self.fuzzy)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.student_ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        student_id = self.student_ids[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return MemberRegistry.display(student_id, self.members.name(student_id))
+        if role == Qt.UserRole:
+            return student_id
+        return None
+
+
+class WaitlistModel(QAbstractListModel):
+    # Members waiting for a PC, first come first served, each shown with
+    # their estimated wait once one has been worked out
+    def __init__(self, members, parent=None):
+        super().__init__(parent)
+        self.members = members
+        self.student_ids = []
+        self.waits = {}  # Student ID -> estimated seconds until a PC frees up
+
+    def set_registry(self, members):
+        self.beginResetModel()
+        self.members = members
+        self.student_ids = []
+        self.waits = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.student_ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        student_id = self.student_ids[index.row()]
+        if role == Qt.DisplayRole:
+            display = MemberRegistry.display(student_id, self.members.name(student_id))
+            text = f"{index.row() + 1}. {display}"
+            if student_id in self.waits:
+                text += f" - {format_wait(self.waits[student_id])}"
+            return text
+        if role == Qt.UserRole:
+            return student_id
+        return None
+
+    def add(self, student_id):
+        row = len(self.student_ids)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.student_ids.append(student_id)
+        self.endInsertRows()
+
+    def remove(self, student_id):
+        if student_id not in self.student_ids:
+            return
+        row = self.student_ids.index(student_id)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.student_ids[row]
+        self.waits.pop(student_id, None)
+        self.endRemoveRows()
+
+    def set_waits(self, waits):
+        # Also renumbers the rows after a removal
+        self.waits = waits
+        if self.student_ids:
+            self.dataChanged.emit(self.index(0), self.index(len(self.student_ids) - 1))
+
+    def __contains__(self, student_id):
+        return student_id in self.student_ids
+
+    def __len__(self):
+        return len(self.student_ids)
+
+
+class EventTableModel(QAbstractTableModel):
+    # Table model over the day's events, stored as Event tuples and kept
+    # sorted by time. Times are epoch seconds, held in a
+    # parallel list so a new event is placed with a binary search instead of
+    # re-sorting. The view only asks for the rows it is showing.
+    headers = ["PC Number", "Name", "Action", "Time"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.events = []
+        self.times = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.events)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            event = self.events[index.row()]
+            column = index.column()
+            if column == 0:
+                return str(event.pc_number)
+            if column == 1:
+                return str(event.name)
+            if column == 2:
+                return event.action
+            return format_time(event.time)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def set_events(self, events):
+        # events must already be in time order
+        self.beginResetModel()
+        self.events = list(events)
+        self.times = [event.time for event in self.events]
+        self.endResetModel()
+
+    def add(self, event):
+        row = bisect.bisect_right(self.times, event.time)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.times.insert(row, event.time)
+        self.events.insert(row, event)
+        self.endInsertRows()
+
+
+class Storage(ABC):
+    # Interface shared by the storage backends. Members are (student_id,
+    # name) pairs; sessions are log rows laid out as LOG_HEADER. Times are
+    # epoch seconds.
+    @abstractmethod
+    def iter_members(self, chunk_size):
+        # Yields the roster as lists of at most chunk_size members
+        pass
+
+    @abstractmethod
+    def add_member(self, student_id, name):
+        pass
+
+    @abstractmethod
+    def remove_members(self, student_ids):
+        pass
+
+    @abstractmethod
+    def log_sign_in(self, event):
+        # Returns a new session ID, used to log the matching sign-out. It
+        # stays valid however the stored rows move around.
+        pass
+
+    @abstractmethod
+    def log_sign_out(self, session_id, event):
+        pass
+
+    @abstractmethod
+    def load_events(self, day):
+        # An Event for every sign-in and sign-out on day ("yyyy-MM-dd"),
+        # oldest first
+        pass
+
+    @abstractmethod
+    def open_sessions(self):
+        # (session_id, sign-in Event, carried) for every session not signed
+        # out yet; carried is true for sessions begun on an earlier day
+        pass
+
+    @abstractmethod
+    def export(self):
+        # Writes the .xlsx files and returns their paths
+        pass
+
+    def rotate(self):
+        # Called around midnight to start a new day's log if needed
+        pass
+
+    def close(self):
+        pass
+
+
+class ExcelStorage(Storage):
+    # Club_Members.xlsx for the roster and a journal per day for the log,
+    # with the workbooks kept up to date by the writer thread. Roster changes
+    # are journaled too until the workbook has been saved with them.
+    def __init__(self, writer):
+        self.writer = writer
+        # Open the last day logged; if that was before today, rolling it over
+        # carries on the sessions left open when the app was last closed
+        self.log_file = self.init_log_excel_file(self.last_logged_day())
+        self.rotate()
+        self.club_file = self.init_club_excel_file()
+
+    @staticmethod
+    def journal_path(day):
+        # Each day's events live in their own journal, so a day's events are
+        # found by file name rather than by scanning the log's history
+        return f"PC_Lounge_Log_{day.replace('-', '')}.journal"
+
+    def last_logged_day(self):
+        today = QDateTime.currentDateTime().toString("yyyy-MM-dd")
+        journals = sorted(
+            path
+            for path in glob.glob("PC_Lounge_Log_*.journal")
+            if path <= self.journal_path(today)
+        )
+        if not journals:
+            return today
+        stamp = journals[-1][len("PC_Lounge_Log_") : -len(".journal")]
+        return f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:]}"
+
+    def init_log_excel_file(self, day, carried=()):
+        self.day = day
+        log_file = f"PC_Lounge_Log_{self.day.replace('-', '')}.xlsx"
+        journal_file = self.journal_path(self.day)
+
+        remove_stale_temp(log_file)
+        new_journal = not os.path.exists(journal_file)
+        self.journal = Journal(journal_file)
+        if new_journal and os.path.exists(log_file):
+            # Seed the journal from a log written before the journal existed
+            self.journal.extend(self.read_log_workbook_records(log_file))
+        elif new_journal:
+            # Sessions still open at the end of the previous day continue
+            # here, so they can be signed out today
+            self.journal.extend(
+                {
+                    "op": "sign_in",
+                    "session": session_id,
+                    "name": event.name,
+                    "student_id": event.student_id,
+                    "time": event.time,
+                    "pc": event.pc_number,
+                    "carried": True,
+                }
+                for session_id, event in carried
+            )
+
+        # Rebuild the day's rows and events from the journal; saving them
+        # below also recovers a workbook that was behind the journal
+        records = self.journal.replay()
+        self.log_rows = {}  # Session ID -> log row, in sign-in order
+        self.open_session_events = {}
+        for record in records:
+            self.apply_log_record(record)
+        self.events = Journal.events(records)
+
+        self.writer.open_sheet(log_file, "PC Log", LOG_HEADER, self.log_rows)
+
+        return log_file
+
+    def rotate(self):
+        today = QDateTime.currentDateTime().toString("yyyy-MM-dd")
+        if today == self.day:
+            return
+        # Open sessions are signed out at the end of the old day and continue
+        # from the start of today, so no time is logged on both days
+        day_end = QDateTime(
+            QDate.fromString(self.day, "yyyy-MM-dd").addDays(1), QTime(0, 0)
+        ).toSecsSinceEpoch()
+        today_start = QDateTime(
+            QDate.fromString(today, "yyyy-MM-dd"), QTime(0, 0)
+        ).toSecsSinceEpoch()
+        carried = self.open_sessions()
+        records = [
+            {"op": "sign_out", "session": session_id, "time": day_end, "carried": True}
+            for session_id, event, _ in carried
+        ]
+        self.journal.extend(records)
+        for record in records:
+            self.apply_log_record(record)
+            self.writer.set_cell(
+                self.log_file, record["session"], 4, self.log_rows[record["session"]][4]
+            )
+
+        old_log_file = self.log_file
+        self.journal.close()
+        self.log_file = self.init_log_excel_file(
+            today,
+            [(session_id, event._replace(time=today_start)) for session_id, event, _ in carried],
+        )
+        self.writer.close_sheet(old_log_file)
+
+    def read_log_workbook_records(self, log_file):
+        records = []
+        wb = openpyxl.load_workbook(log_file, read_only=True)
+        ws = wb.active
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            name, student_id, sign_in_time, pc_number, sign_out_time = row[:5]
+            if not sign_in_time:
+                continue
+            session_id = uuid.uuid4().hex
+            record = {
+                "op": "sign_in",
+                "session": session_id,
+                "name": name,
+                "student_id": student_id,
+                "time": parse_time(sign_in_time),
+                "pc": pc_number,
+            }
+            if row[5:6] == ("Yes",):
+                record["carried"] = True
+            records.append(record)
+            if sign_out_time:
+                records.append(
+                    {
+                        "op": "sign_out",
+                        "session": session_id,
+                        "time": parse_time(sign_out_time),
+                    }
+                )
+        wb.close()
+        # Each row's sign-out follows its own sign-in above; the journal
+        # and the event table want them in time order. The sort is stable,
+        # so a sign-in stays ahead of a sign-out logged in the same second.
+        records.sort(key=lambda record: record["time"])
+        return records
+
+    def apply_log_record(self, record):
+        if record["op"] == "sign_in":
+            self.open_session_events[record["session"]] = (
+                Event(record["time"], record["pc"], record["student_id"], record["name"], SIGN_IN),
+                bool(record.get("carried")),
+            )
+            self.log_rows[record["session"]] = [
+                record["name"],
+                record["student_id"],
+                format_time(record["time"]),
+                record["pc"],
+                "",
+                "Yes" if record.get("carried") else "",
+            ]
+        elif record["op"] == "sign_out":
+            self.log_rows[record["session"]][4] = format_time(record["time"])
+            self.open_session_events.pop(record["session"], None)
+
+    def init_club_excel_file(self):
+        club_file = "Club_Members.xlsx"
+        remove_stale_temp(club_file)
+
+        if not os.path.exists(club_file):
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Members"
+            ws.append(MEMBER_HEADER)
+            atomic_save(wb, club_file)
+
+        self.roster_journal = Journal("Club_Members.journal")
+        records = self.roster_journal.replay()
+        if records:
+            # The last session ended before these changes were saved
+            self.recover_roster(club_file, records)
+            self.roster_journal.clear()
+
+        return club_file
+
+    def recover_roster(self, club_file, records):
+        wb = openpyxl.load_workbook(club_file, read_only=True)
+        rows = {
+            str(row[0]): [str(row[0]), row[1]]
+            for row in wb.active.iter_rows(min_row=2, max_col=2, values_only=True)
+            if row[0] is not None
+        }
+        wb.close()
+
+        for record in records:
+            if record["op"] == "add":
+                rows[record["student_id"]] = [record["student_id"], record["name"]]
+            elif record["op"] == "remove":
+                for student_id in record["student_ids"]:
+                    rows.pop(student_id, None)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Members")
+        ws.append(MEMBER_HEADER)
+        for row in rows.values():
+            ws.append(row)
+        atomic_save(wb, club_file)
+        wb.close()
+
+    def iter_members(self, chunk_size):
+        rows = {}
+        chunk = []
+        wb = openpyxl.load_workbook(self.club_file, read_only=True)
+        try:
+            for row in wb.active.iter_rows(min_row=2, max_col=2, values_only=True):
+                if row[0] is None:
+                    continue
+                student_id = str(row[0])
+                rows[student_id] = [student_id, row[1]]
+                chunk.append((student_id, row[1]))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+        finally:
+            wb.close()
+        if chunk:
+            yield chunk
+
+        # From here on the writer owns the roster sheet, so adds and deletes
+        # only touch the affected rows
+        self.writer.open_sheet(self.club_file, "Members", MEMBER_HEADER, rows, save=False)
+
+    def add_member(self, student_id, name):
+        self.roster_journal.append({"op": "add", "student_id": student_id, "name": name})
+        self.writer.append_row(self.club_file, student_id, [student_id, name])
+
+    def remove_members(self, student_ids):
+        student_ids = list(student_ids)
+        self.roster_journal.append({"op": "remove", "student_ids": student_ids})
+        self.writer.delete_rows(self.club_file, student_ids)
+
+    def log_sign_in(self, event):
+        session_id = uuid.uuid4().hex
+        record = {
+            "op": "sign_in",
+            "session": session_id,
+            "name": event.name,
+            "student_id": event.student_id,
+            "time": event.time,
+            "pc": event.pc_number,
+        }
+        self.journal.append(record)
+        self.apply_log_record(record)
+        self.events.append(event)
+        self.writer.append_row(self.log_file, session_id, self.log_rows[session_id])
+        return session_id
+
+    def log_sign_out(self, session_id, event):
+        record = {"op": "sign_out", "session": session_id, "time": event.time}
+        self.journal.append(record)
+        self.apply_log_record(record)
+        # Usually the newest event, but not when restoring sessions
+        bisect.insort(self.events, event)
+        self.writer.set_cell(self.log_file, session_id, 4, self.log_rows[session_id][4])
+
+    def open_sessions(self):
+        return [
+            (session_id, event, carried)
+            for session_id, (event, carried) in self.open_session_events.items()
+        ]
+
+    def load_events(self, day):
+        if day == self.day:
+            return list(self.events)
+        path = self.journal_path(day)
+        if not os.path.exists(path):
+            return []
+        return Journal.events(Journal.read(path))
+
+    def export(self):
+        # The workbooks are already kept current; just don't wait for the window
+        self.writer.flush()
+        return [self.log_file, self.club_file]
+
+    def close(self):
+        # Called once the writer has stopped; the roster journal is only
+        # needed if the final save of the roster failed
+        if self.club_file not in self.writer.unsaved:
+            self.roster_journal.clear()
+        self.roster_journal.close()
+        self.journal.close()
+
+
+class SQLiteStorage(Storage):
+    # Members and sessions in one SQLite database. The .xlsx files are only
+    # produced when exported.
+    def __init__(self, writer, path="pclounge.db"):
+        self.writer = writer
+        import_roster = not os.path.exists(path)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS members (
+                student_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                student_id TEXT NOT NULL,
+                sign_in_time TEXT NOT NULL,
+                pc_number INTEGER NOT NULL,
+                sign_out_time TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS sessions_student_id ON sessions (student_id);
+            CREATE INDEX IF NOT EXISTS sessions_sign_in_time ON sessions (sign_in_time);
+            CREATE INDEX IF NOT EXISTS sessions_sign_out_time ON sessions (sign_out_time);
+            """
+        )
+        if import_roster and os.path.exists("Club_Members.xlsx"):
+            # Carry the existing roster over the first time the database is created
+            wb = openpyxl.load_workbook("Club_Members.xlsx", read_only=True)
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO members VALUES (?, ?)",
+                    (
+                        (str(row[0]), row[1])
+                        for row in wb.active.iter_rows(min_row=2, values_only=True)
+                        if row[0] is not None
+                    ),
+                )
+            wb.close()
+
+    def iter_members(self, chunk_size):
+        cursor = self.db.execute("SELECT student_id, name FROM members ORDER BY rowid")
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def add_member(self, student_id, name):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO members VALUES (?, ?)", (student_id, name)
+            )
+
+    def remove_members(self, student_ids):
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM members WHERE student_id = ?",
+                ((student_id,) for student_id in student_ids),
+            )
+
+    def log_sign_in(self, event):
+        session_id = uuid.uuid4().hex
+        with self.db:
+            self.db.execute(
+                "INSERT INTO sessions"
+                " (session_id, name, student_id, sign_in_time, pc_number)"
+                " VALUES (?, ?, ?, datetime(?, 'unixepoch', 'localtime'), ?)",
+                (session_id, event.name, event.student_id, event.time, event.pc_number),
+            )
+        return session_id
+
+    def log_sign_out(self, session_id, event):
+        with self.db:
+            self.db.execute(
+                "UPDATE sessions"
+                " SET sign_out_time = datetime(?, 'unixepoch', 'localtime')"
+                " WHERE session_id = ?",
+                (event.time, session_id),
+            )
+
+    def load_events(self, day):
+        # Two range seeks on the time indexes, merged by time. The stored
+        # local time text is turned into epoch seconds by SQLite itself.
+        day_range = (f"{day} 00:00:00", f"{day} 23:59:59")
+        sign_ins = self.db.execute(
+            "SELECT CAST(strftime('%s', sign_in_time, 'utc') AS INTEGER),"
+            " pc_number, student_id, name, ? FROM sessions"
+            " WHERE sign_in_time BETWEEN ? AND ? ORDER BY sign_in_time",
+            (SIGN_IN, *day_range),
+        )
+        sign_outs = self.db.execute(
+            "SELECT CAST(strftime('%s', sign_out_time, 'utc') AS INTEGER),"
+            " pc_number, student_id, name, ? FROM sessions"
+            " WHERE sign_out_time BETWEEN ? AND ? ORDER BY sign_out_time",
+            (SIGN_OUT, *day_range),
+        )
+        return list(
+            heapq.merge(
+                map(Event._make, sign_ins),
+                map(Event._make, sign_outs),
+                key=lambda event: event.time,
+            )
+        )
+
+    def open_sessions(self):
+        # Uses the sign-out time index to find the sessions with no sign-out.
+        # Sessions aren't split by day here, so carried ones are simply those
+        # signed in before today.
+        return [
+            (row[0], Event._make(row[1:6]), bool(row[6]))
+            for row in self.db.execute(
+                "SELECT session_id,"
+                " CAST(strftime('%s', sign_in_time, 'utc') AS INTEGER),"
+                " pc_number, student_id, name, ?,"
+                " sign_in_time < date('now', 'localtime') FROM sessions"
+                " WHERE sign_out_time = '' ORDER BY id",
+                (SIGN_IN,),
+            )
+        ]
+
+    def select_sessions(self, where="", parameters=()):
+        return [
+            list(row)
+            for row in self.db.execute(
+                "SELECT name, student_id, sign_in_time, pc_number, sign_out_time"
+                f" FROM sessions {where} ORDER BY sign_in_time",
+                parameters,
+            )
+        ]
+
+    def export(self):
+        # One roster workbook plus one log workbook per day, written by the
+        # writer thread
+        paths = ["Club_Members.xlsx"]
+        self.writer.export_sheet(
+            paths[0],
+            "Members",
+            MEMBER_HEADER,
+            enumerate(
+                self.db.execute("SELECT student_id, name FROM members ORDER BY rowid")
+            ),
+        )
+
+        days = {}
+        for row in self.select_sessions():
+            days.setdefault(row[2][:10], []).append(row)
+        for day, rows in days.items():
+            path = f"PC_Lounge_Log_{day.replace('-', '')}.xlsx"
+            self.writer.export_sheet(path, "PC Log", LOG_HEADER, enumerate(rows))
+            paths.append(path)
+
+        self.writer.flush()
+        return paths
+
+    def close(self):
+        self.db.close()
+
+
+# Selected with the PCLOUNGE_STORAGE environment variable
+STORAGE_BACKENDS = {"excel": ExcelStorage, "sqlite": SQLiteStorage}
+STORAGE_BACKEND = os.environ.get("PCLOUNGE_STORAGE", "excel")
+
+
+class PCState:
+    # Everything about one PC on the grid: its seat, its widgets and who is
+    # using it. Slotted since there is one per seat and they are touched on
+    # every sign-in and sign-out.
+    __slots__ = (
+        "seat",
+        "button",
+        "user_label",
+        "status",
+        "session_id",
+        "student_id",
+        "user_name",
+        "signed_in_at",
+        "carried",
+    )
+
+    def __init__(self, seat, button, user_label):
+        self.seat = seat
+        self.button = button
+        self.user_label = user_label
+        self.status = "Free"
+        self.session_id = None
+        self.student_id = None
+        self.user_name = None
+        self.signed_in_at = None
+        self.carried = False  # Signed in on an earlier day
 
-pcnums = [16,15,14,11,12,13,10,9,8,5,6,7,4,3,2,1]
 
 class PCLoungeApp(QMainWindow):
     def __init__(self):
@@ -41,6 +1472,11 @@ class PCLoungeApp(QMainWindow):
         # Global setting for allowing same person to sign into the same PC
         self.allow_same_person = False
 
+        # Club members, filled from storage by load_club_members
+        self.members = MemberRegistry()
+        self.member_model = MemberListModel(self.members, self)
+        self.member_completion_model = MemberCompletionModel(self.members, self)
+
         # Create tab widget
         self.tab_widget = QTabWidget()
         self.main_tab = QWidget()
@@ -54,6 +1490,9 @@ class PCLoungeApp(QMainWindow):
         # Set up Club People Tab
         self.setup_club_people_tab()
 
+        # Built once and reused for every sign-in
+        self.setup_sign_in_dialog()
+
         # Add tab widget to the main layout
         main_layout = QHBoxLayout()
         main_layout.addWidget(self.tab_widget)
@@ -61,39 +1500,107 @@ class PCLoungeApp(QMainWindow):
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
-        # Initialize Excel files
-        self.log_file = self.init_log_excel_file()
-        self.club_file = self.init_club_excel_file()
+        # Workbooks are saved on a background thread so clicks never wait on disk
+        self.writer = WorkbookWriter(self)
+        self.writer.saved.connect(self.on_workbook_saved)
+        self.writer.failed.connect(self.on_workbook_save_failed)
+        self.writer.start()
+
+        # Open the member roster and today's log
+        self.storage = STORAGE_BACKENDS[STORAGE_BACKEND](self.writer)
 
         # Load club members and events
         self.load_club_members()
+        # Restoring can log sign-outs, so it goes before loading the events
+        self.restore_open_sessions()
         self.load_events()
 
+        # Start a new day's log at midnight without a restart
+        self.rotation_timer = QTimer(self)
+        self.rotation_timer.setSingleShot(True)
+        self.rotation_timer.setTimerType(Qt.PreciseTimer)
+        self.rotation_timer.timeout.connect(self.rotate_log)
+        self.schedule_log_rotation()
+
+        # Waits go up as sessions run on, so re-estimate them now and then
+        self.waitlist_timer = QTimer(self)
+        self.waitlist_timer.timeout.connect(self.update_wait_estimates)
+        self.waitlist_timer.start(30000)
+
+        # Ready for the first card scan
+        self.scan_input.setFocus()
+
     def setup_main_tab(self):
         layout = QHBoxLayout()
 
         # Left side: PC Grid
         self.pc_layout = QGridLayout()
-        self.pc_statuses = (
-            {}
-        )  # Track whether each PC is free or in use, and store the row in Excel for each PC
-        self.create_pc_grid(16)
+        self.pcs = {}  # PC number -> its PCState
+        self.active_sessions = {}  # Student ID -> PCs they are signed into
+        self.seats = load_layout()
+        self.free_seats = FreeSeatPool(SEAT_PREFERENCES[SEAT_PREFERENCE](self.seats))
+        self.create_pc_grid(self.seats)
         layout.addLayout(self.pc_layout)
 
         # Right side: Events
         right_layout = QVBoxLayout()
-        self.people_table = QTableWidget()
-        self.people_table.setColumnCount(4)
-        self.people_table.setHorizontalHeaderLabels(
-            ["PC Number", "Name", "Action", "Time"]
-        )
+        self.event_model = EventTableModel(self)
+        self.people_table = QTableView()
+        self.people_table.setFocusPolicy(Qt.NoFocus)
+        self.people_table.setModel(self.event_model)
         self.people_table.setColumnWidth(3, 200)
         self.people_table.verticalHeader().setVisible(False)
+        # Fixed row heights let the view skip measuring rows it isn't showing
+        self.people_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+        # Card scanner input: scanning a card signs its owner straight in
+        scan_layout = QHBoxLayout()
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan student card")
+        self.scan_input.returnPressed.connect(self.scan_card)
+        self.scan_pc_combo = QComboBox()
+        # Nothing else on the main tab takes keyboard focus, so a scanner's
+        # keystrokes always land in the scan field
+        self.scan_pc_combo.setFocusPolicy(Qt.NoFocus)
+        self.scan_pc_combo.activated.connect(lambda _: self.scan_input.setFocus())
+        self.scan_pc_combo.addItem("Next free PC", None)
+        for seat in self.seats:
+            self.scan_pc_combo.addItem(seat.label, seat.number)
+        scan_layout.addWidget(self.scan_input)
+        scan_layout.addWidget(QLabel("Assign to:"))
+        scan_layout.addWidget(self.scan_pc_combo)
+        self.assign_button = QPushButton("Assign Any Free PC")
+        self.assign_button.setFocusPolicy(Qt.NoFocus)
+        self.assign_button.clicked.connect(self.assign_any_free_pc)
+        scan_layout.addWidget(self.assign_button)
+        right_layout.addLayout(scan_layout)
+        self.scan_result = QLabel()
+        right_layout.addWidget(self.scan_result)
 
         right_layout.addWidget(QLabel("Events"))
 
         right_layout.addWidget(self.people_table)
 
+        # Waitlist: offered the next PC to be signed out
+        self.waitlist_model = WaitlistModel(self.members, self)
+        self.waitlist_view = QListView()
+        self.waitlist_view.setFocusPolicy(Qt.NoFocus)
+        self.waitlist_view.setModel(self.waitlist_model)
+        self.waitlist_view.setMaximumHeight(150)
+        waitlist_buttons = QHBoxLayout()
+        self.join_waitlist_button = QPushButton("Add to Waitlist")
+        self.join_waitlist_button.setFocusPolicy(Qt.NoFocus)
+        self.join_waitlist_button.clicked.connect(self.show_waitlist_dialog)
+        self.leave_waitlist_button = QPushButton("Remove from Waitlist")
+        self.leave_waitlist_button.setFocusPolicy(Qt.NoFocus)
+        self.leave_waitlist_button.clicked.connect(self.leave_waitlist)
+        waitlist_buttons.addWidget(self.join_waitlist_button)
+        waitlist_buttons.addWidget(self.leave_waitlist_button)
+
+        right_layout.addWidget(QLabel("Waitlist"))
+        right_layout.addWidget(self.waitlist_view)
+        right_layout.addLayout(waitlist_buttons)
+
         layout.addLayout(right_layout)
 
         self.main_tab.setLayout(layout)
@@ -106,47 +1613,154 @@ class PCLoungeApp(QMainWindow):
         self.add_button.clicked.connect(self.add_person)
         layout.addWidget(self.add_button)
 
-        # Delete button
+        # Delete button, removes every selected member
         self.delete_button = QPushButton("Delete Person")
         self.delete_button.clicked.connect(self.delete_person)
         layout.addWidget(self.delete_button)
 
-        # List of members
-        self.club_people_list = QListWidget()
+        # Export button
+        self.export_button = QPushButton("Export to Excel")
+        self.export_button.clicked.connect(self.export_to_excel)
+        layout.addWidget(self.export_button)
+
+        # List of members, filtered by the search box
+        self.member_filter_model = QSortFilterProxyModel(self)
+        self.member_filter_model.setSourceModel(self.member_model)
+        self.member_filter_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self.member_search = QLineEdit()
+        self.member_search.setPlaceholderText("Search members")
+        self.member_search.textChanged.connect(self.filter_members)
+
+        self.club_people_list = QListView()
+        self.club_people_list.setModel(self.member_filter_model)
+        self.club_people_list.setUniformItemSizes(True)
+        self.club_people_list.setSelectionMode(QListView.ExtendedSelection)
         layout.addWidget(QLabel("Club Members"))
+        layout.addWidget(self.member_search)
         layout.addWidget(self.club_people_list)
 
         self.club_people_tab.setLayout(layout)
 
-    def create_pc_grid(self, num_pcs):
-        for i in range(num_pcs):
-            pc_button = QPushButton(f"PC {pcnums[i]} (Free)")
-            pc_button.setStyleSheet(
-                "background-color: lightgreen; font-size: 16px; padding: 10px;"
+    def setup_sign_in_dialog(self):
+        self.sign_in_pc = None
+        self.sign_in_dialog = QDialog(self)
+        self.sign_in_dialog.setWindowTitle("Select Club Member")
+
+        layout = QVBoxLayout()
+
+        # Shares the roster model with the Club People tab, so opening the
+        # dialog never copies the roster
+        self.member_combobox = QComboBox()
+        self.member_combobox.setMinimumWidth(400)
+        self.member_combobox.setEditable(True)  # Enable text input for searching
+        self.member_combobox.setInsertPolicy(QComboBox.NoInsert)
+        self.member_combobox.setModel(self.member_model)
+
+        # Suggest members from the search index while typing
+        completer = QCompleter(self.member_completion_model, self.sign_in_dialog)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.member_combobox.setCompleter(completer)
+
+        def complete(text):
+            self.member_completion_model.search(text)
+            if self.member_completion_model.rowCount():
+                completer.complete()
+
+        self.member_combobox.lineEdit().textEdited.connect(complete)
+
+        layout.addWidget(QLabel("Select Club Member:"))
+        layout.addWidget(self.member_combobox)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.validate_sign_in)
+        buttons.rejected.connect(self.sign_in_dialog.reject)
+        layout.addWidget(buttons)
+
+        self.sign_in_dialog.setLayout(layout)
+
+    def validate_sign_in(self):
+        # Validate selection before accepting
+        selected_member = self.member_combobox.currentText()
+        if self.members.find_by_display(selected_member) is None:
+            QMessageBox.warning(
+                self.sign_in_dialog, "Invalid Selection", "Please select a valid club member."
+            )
+        elif self.sign_in_pc is None:
+            message = self.join_waitlist(self.members.find_by_display(selected_member))
+            self.statusBar().showMessage(message, 5000)
+            self.sign_in_dialog.accept()
+        else:
+            self.sign_in_member(self.sign_in_pc, self.sign_in_dialog)  # Proceed if valid
+
+    def create_pc_grid(self, seats):
+        # A single zone fills the grid directly; with several, each zone gets
+        # its own titled grid, stacked in file order
+        zones = list(dict.fromkeys(seat.zone for seat in seats))
+        zone_grids = {}
+        for i, zone in enumerate(zones):
+            if len(zones) == 1:
+                zone_grids[zone] = self.pc_layout
+            else:
+                zone_box = QGroupBox(zone)
+                zone_grids[zone] = QGridLayout(zone_box)
+                self.pc_layout.addWidget(zone_box, i, 0)
+
+        for seat in seats:
+            pc_button = QPushButton()
+            pc_button.setFocusPolicy(Qt.NoFocus)
+            pc_button.clicked.connect(lambda _, pc=seat.number: self.toggle_pc_status(pc))
+            pc_button.setContextMenuPolicy(Qt.CustomContextMenu)
+            pc_button.customContextMenuRequested.connect(
+                lambda pos, pc=seat.number: self.show_pc_menu(pc, pos)
             )
-            pc_button.clicked.connect(lambda _, pc=i: self.toggle_pc_status(pc))
 
             pc_label = QLabel()
 
-            if i < 12:  # First 3 rows of 4
-                row, col = divmod(i, 3)
-            else:  # Last row of 4
-                row, col = 4, i - 12  # Set to the last row
-            row = row*2
+            # Each PC takes two grid rows, its button above its user
+            grid = zone_grids[seat.zone]
+            grid.addWidget(pc_button, seat.row * 2, seat.column)
+            grid.addWidget(pc_label, seat.row * 2 + 1, seat.column)
 
-            self.pc_layout.addWidget(pc_button, row, col * 2)
-            self.pc_layout.addWidget(pc_label, row+1, col * 2)
+            self.pcs[seat.number] = PCState(seat, pc_button, pc_label)
+            self.set_pc_state(self.pcs[seat.number], "Free")
 
-            self.pc_statuses[i] = {
-                "status": "Free",
-                "excel_row": None,
-                "user_label": pc_label,
-                "user_name":None,
-            }
+    def set_pc_state(self, pc, status):
+        # Colours come from the application stylesheet's rule for the
+        # "state" property, so a state change only needs a re-polish
+        pc.status = status
+        if status == "Free":
+            self.free_seats.add(pc.seat.number)
+        else:
+            self.free_seats.discard(pc.seat.number)
+        pc.button.setText(f"{pc.seat.label} ({status})")
+        pc.button.setProperty("state", status)
+        pc.button.style().unpolish(pc.button)
+        pc.button.style().polish(pc.button)
+
+    def show_pc_menu(self, pc_id, pos):
+        # Right-click a PC nobody is using to reserve it or take it out of order
+        pc = self.pcs[pc_id]
+        if pc.status == "In Use":
+            return
+        menu = QMenu(self)
+        for status in ("Free", "Reserved", "Out of Order"):
+            if status != pc.status:
+                action = menu.addAction(f"Mark {status}")
+                action.triggered.connect(lambda _, status=status: self.mark_pc(pc_id, status))
+        menu.exec_(pc.button.mapToGlobal(pos))
+
+    def mark_pc(self, pc_id, status):
+        # A PC freed up here goes to the waitlist just like a signed-out one
+        self.set_pc_state(self.pcs[pc_id], status)
+        if status == "Free":
+            self.offer_to_waitlist(pc_id)
+        self.update_wait_estimates()
 
     def toggle_pc_status(self, pc_id):
-        if self.pc_statuses[pc_id]["status"] == "Free":
-            if not self.club_people_list.count():
+        pc = self.pcs[pc_id]
+        if pc.status in ("Free", "Reserved"):
+            if not len(self.members):
                 QMessageBox.warning(
                     self,
                     "No Members",
@@ -155,212 +1769,323 @@ class PCLoungeApp(QMainWindow):
                 return
 
             # Prompt for club member selection
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Select Club Member")
-
-            layout = QVBoxLayout()
-
-            self.member_combobox = QComboBox()
-            self.member_combobox.setMinimumWidth(400)
-            self.member_combobox.setEditable(True)  # Enable text input for searching
-
-            # Populate the combo box with member names
-            member_names = [self.club_people_list.item(i).text() for i in range(self.club_people_list.count())]
-            self.member_combobox.addItems(member_names)
-
-            # Enable filtering while typing
-            completer = QCompleter(member_names)
-            completer.setCaseSensitivity(Qt.CaseInsensitive)  # Case-insensitive search
-            completer.setFilterMode(Qt.MatchContains)  # Match anywhere in the text
-            self.member_combobox.setCompleter(completer)
-
-            layout.addWidget(QLabel("Select Club Member:"))
-            layout.addWidget(self.member_combobox)
-
-            buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-
-            # Validate selection before accepting
-            def validate_selection():
-                selected_member = self.member_combobox.currentText()
-                if selected_member not in member_names:
-                    QMessageBox.warning(dialog, "Invalid Selection", "Please select a valid club member.")
-                else:
-                    self.sign_in_member(pc_id, dialog)  # Proceed if valid
-
-            buttons.accepted.connect(validate_selection)
-            buttons.rejected.connect(dialog.reject)
-            layout.addWidget(buttons)
-
-            dialog.setLayout(layout)
-            dialog.exec_()
-
-        elif self.pc_statuses[pc_id]["status"] == "In Use":
-            sign_out_time = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-
-            pc_button = self.pc_layout.itemAt(pc_id * 2).widget()
-            pc_button.setText(f"PC {pcnums[pc_id]} (Free)")
-            pc_button.setStyleSheet(
-                "background-color: lightgreen; font-size: 16px; padding: 10px;"
-            )
-            self.pc_statuses[pc_id]["status"] = "Free"
-            previous_user = self.pc_statuses[pc_id]["user_name"]
-            self.pc_statuses[pc_id]["user_label"].setText("None")
-
-            # Log sign-out
-            self.log_sign_out_to_excel(
-                self.pc_statuses[pc_id]["excel_row"], sign_out_time
-            )
-
-            # Update table for sign-out
-            self.people_table.insertRow(self.people_table.rowCount())
-            self.people_table.setItem(
-                self.people_table.rowCount() - 1, 0, QTableWidgetItem(str(pcnums[pc_id]))
-            )
-            self.people_table.setItem(
-                self.people_table.rowCount() - 1,
-                1,
-                QTableWidgetItem(str(previous_user)),
-            )
-            self.people_table.setItem(
-                self.people_table.rowCount() - 1, 2, QTableWidgetItem("Sign-Out")
-            )
-            self.people_table.setItem(
-                self.people_table.rowCount() - 1, 3, QTableWidgetItem(sign_out_time)
+            self.show_sign_in_dialog(pc_id, f"Sign In to {pc.seat.label}")
+
+        elif pc.status == "In Use":
+            sign_out_time = QDateTime.currentSecsSinceEpoch()
+
+            self.set_pc_state(pc, "Free")
+            previous_user = pc.user_name
+            pc.user_label.setText("None")
+
+            student_id = pc.student_id
+            self.active_sessions[student_id].discard(pc_id)
+            if not self.active_sessions[student_id]:
+                del self.active_sessions[student_id]
+
+            # Log sign-out and update table
+            event = Event(sign_out_time, pc_id, student_id, previous_user, SIGN_OUT)
+            self.storage.log_sign_out(pc.session_id, event)
+            self.event_model.add(event)
+
+            if not pc.carried:
+                # Sessions carried over from an earlier day aren't today's
+                self.sessions_ended += 1
+                self.session_seconds += sign_out_time - pc.signed_in_at
+            self.offer_to_waitlist(pc_id)
+            self.update_wait_estimates()
+
+    def show_sign_in_dialog(self, pc_id, title):
+        # pc_id None picks a member for the waitlist instead
+        self.sign_in_pc = pc_id
+        self.sign_in_dialog.setWindowTitle(title)
+        self.member_combobox.setCurrentIndex(-1)
+        self.member_combobox.clearEditText()
+        self.member_completion_model.search("")
+        self.member_combobox.setFocus()
+        self.sign_in_dialog.exec_()
+        self.scan_input.setFocus()
+
+    def show_waitlist_dialog(self):
+        if not len(self.members):
+            QMessageBox.warning(
+                self,
+                "No Members",
+                "No club members available. Please add members first.",
             )
-
-    def sign_in_member(self, pc_id, dialog):
-        selected_member = self.member_combobox.currentText()
-        student_id = selected_member.split("(")[-1].strip(")")
-        student_name = selected_member.split("(")[0].strip()
-        sign_in_time = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-
-        # Check if the person is already signed in to the same PC
-        if not self.allow_same_person:
-            for pc, status in self.pc_statuses.items():
-                if (
-                    status["status"] == "In Use"
-                    and f"Name: {student_name}\nID: {student_id}"
-                    == status.get("user_label", "").text()
-                ):
-                    QMessageBox.warning(
-                        self,
-                        "Error",
-                        f"{student_name} is already signed into another PC.",
-                    )
-                    dialog.reject()
-                    return
-
-        pc_button = self.pc_layout.itemAt(pc_id * 2).widget()
-        pc_button.setText(f"PC {pcnums[pc_id]} (In Use)")
-        pc_button.setStyleSheet(
-            "background-color: lightcoral; font-size: 16px; padding: 10px;"
+            return
+        self.show_sign_in_dialog(None, "Add to Waitlist")
+
+    def join_waitlist(self, student_id):
+        # Returns what happened, for whoever asked to show
+        student_name = self.members.name(student_id)
+        if student_id in self.waitlist_model:
+            message = f"{student_name} is already on the waitlist"
+        elif not self.allow_same_person and self.active_sessions.get(student_id):
+            message = f"{student_name} is already signed into a PC"
+        else:
+            self.waitlist_model.add(student_id)
+            self.update_wait_estimates()
+            message = f"{student_name} is number {len(self.waitlist_model)} on the waitlist"
+            if student_id in self.waitlist_model.waits:
+                message += f", {format_wait(self.waitlist_model.waits[student_id])}"
+        return message
+
+    def leave_waitlist(self):
+        for index in self.waitlist_view.selectionModel().selectedIndexes():
+            self.waitlist_model.remove(index.data(Qt.UserRole))
+        self.update_wait_estimates()
+
+    def offer_to_waitlist(self, pc_id):
+        # Offer a PC that has just become free to whoever has waited longest;
+        # if they are not around they stay first in line
+        if not len(self.waitlist_model):
+            return
+        student_id = self.waitlist_model.student_ids[0]
+        answer = QMessageBox.question(
+            self,
+            "Waitlist",
+            f"{self.pcs[pc_id].seat.label} is free. Sign in "
+            f"{self.members.name(student_id)}, next on the waitlist?",
         )
-        self.pc_statuses[pc_id]["status"] = "In Use"
-        self.pc_statuses[pc_id]["user_label"].setText(f"Name: {student_name}\nID: {student_id}")
-        self.pc_statuses[pc_id]["user_name"] = student_name
+        if answer == QMessageBox.Yes:
+            self.sign_in(pc_id, student_id)
+
+    def update_wait_estimates(self):
+        # Each PC in use is expected to free up once its session reaches the
+        # average length so far today. Taking waiting members in order, each
+        # gets the next PC to free up and is expected to hold it for an
+        # average session in turn.
+        now = QDateTime.currentSecsSinceEpoch()
+        if self.sessions_ended:
+            average = self.session_seconds // self.sessions_ended
+        else:
+            average = DEFAULT_SESSION_MINUTES * 60
+        free_at = [now] * len(self.free_seats) + [
+            max(now, pc.signed_in_at + average)
+            for pc in self.pcs.values()
+            if pc.status == "In Use"
+        ]
+        heapq.heapify(free_at)
+
+        waits = {}
+        if free_at:
+            for student_id in self.waitlist_model.student_ids:
+                pc_free_at = heapq.heappop(free_at)
+                waits[student_id] = pc_free_at - now
+                heapq.heappush(free_at, pc_free_at + average)
+        self.waitlist_model.set_waits(waits)
+
+    def assign_any_free_pc(self):
+        # Sign someone in to the best free PC without hunting for it on the grid
+        pc_id = self.free_seats.peek()
+        if pc_id is None:
+            QMessageBox.warning(self, "No Free PCs", "No PC is free right now.")
+            return
+        self.toggle_pc_status(pc_id)
 
-        self.people_table.insertRow(self.people_table.rowCount())
-        self.people_table.setItem(
-            self.people_table.rowCount() - 1, 0, QTableWidgetItem(str(pcnums[pc_id]))
-        )
-        self.people_table.setItem(
-            self.people_table.rowCount() - 1, 1, QTableWidgetItem(student_name)
-        )
-        self.people_table.setItem(
-            self.people_table.rowCount() - 1, 2, QTableWidgetItem("Sign-In")
-        )
-        self.people_table.setItem(
-            self.people_table.rowCount() - 1, 3, QTableWidgetItem(sign_in_time)
-        )
+    def sign_in_member(self, pc_id, dialog):
+        student_id = self.members.find_by_display(self.member_combobox.currentText())
+        student_name = self.members.name(student_id)
 
-        row = self.log_sign_in_to_excel(
-            student_name, student_id, sign_in_time, pcnums[pc_id]
-        )
-        self.pc_statuses[pc_id]["excel_row"] = row
+        # Check if the person is already signed in to another PC
+        if not self.allow_same_person and self.active_sessions.get(student_id):
+            QMessageBox.warning(
+                self,
+                "Error",
+                f"{student_name} is already signed into another PC.",
+            )
+            dialog.reject()
+            return
 
+        self.sign_in(pc_id, student_id)
         dialog.accept()
 
-    def init_log_excel_file(self):
-        current_time = QDateTime.currentDateTime().toString("yyyyMMdd")
-        log_file = f"PC_Lounge_Log_{current_time}.xlsx"
-
-        if not os.path.exists(log_file):
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "PC Log"
-            ws.append(
-                ["Name", "Student ID", "Sign-In Time", "PC Number", "Sign-Out Time"]
+    def sign_in(self, pc_id, student_id):
+        student_name = self.members.name(student_id)
+        sign_in_time = QDateTime.currentSecsSinceEpoch()
+
+        event = Event(sign_in_time, pc_id, student_id, student_name, SIGN_IN)
+        self.event_model.add(event)
+        session_id = self.storage.log_sign_in(event)
+        self.mark_pc_in_use(pc_id, student_id, student_name, session_id, sign_in_time)
+        if student_id in self.waitlist_model:
+            self.waitlist_model.remove(student_id)
+            self.update_wait_estimates()
+
+    def scan_card(self):
+        # A card scanner types the student ID and presses Enter. The member
+        # is signed in to the PC picked under "Assign to", or else the
+        # best free PC, with no dialog. With no PC free they join the
+        # waitlist. The outcome goes to the label under the scan field, which
+        # nothing else writes to, and never to a dialog, so the next scan is
+        # never blocked.
+        student_id = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not student_id:
+            return
+        if student_id not in self.members:
+            QApplication.beep()
+            self.scan_result.setText(f"No club member with student ID {student_id}")
+            return
+
+        student_name = self.members.name(student_id)
+        if not self.allow_same_person and self.active_sessions.get(student_id):
+            QApplication.beep()
+            pc_labels = ", ".join(
+                self.pcs[pc_id].seat.label for pc_id in self.active_sessions[student_id]
             )
-            wb.save(log_file)
-
-        return log_file
-
-    def log_sign_in_to_excel(self, name, student_id, sign_in_time, pc_number):
-        wb = openpyxl.load_workbook(self.log_file)
-        ws = wb.active
-        ws.append([name, student_id, sign_in_time, pc_number, ""])
-        row = ws.max_row
-        wb.save(self.log_file)
-        wb.close()
-        return row
-
-    def log_sign_out_to_excel(self, row, sign_out_time):
-        wb = openpyxl.load_workbook(self.log_file)
-        ws = wb.active
-        ws.cell(row=row, column=5).value = sign_out_time
-        wb.save(self.log_file)
-        wb.close()
-
-    def init_club_excel_file(self):
-        club_file = "Club_Members.xlsx"
+            self.scan_result.setText(f"{student_name} is already signed into {pc_labels}")
+            return
+
+        # A picked PC is for this scan only
+        pc_id = self.scan_pc_combo.currentData()
+        self.scan_pc_combo.setCurrentIndex(0)
+        if pc_id is None:
+            pc_id = self.free_seats.peek()
+            if pc_id is None:
+                self.scan_result.setText(self.join_waitlist(student_id))
+                return
+        elif self.pcs[pc_id].status not in ("Free", "Reserved"):
+            QApplication.beep()
+            self.scan_result.setText(f"{self.pcs[pc_id].seat.label} is not free")
+            return
+
+        self.sign_in(pc_id, student_id)
+        self.scan_result.setText(f"{student_name} signed in to {self.pcs[pc_id].seat.label}")
+
+    def mark_pc_in_use(
+        self, pc_id, student_id, student_name, session_id, signed_in_at, carried=False
+    ):
+        pc = self.pcs[pc_id]
+        self.set_pc_state(pc, "In Use")
+        pc.user_label.setText(f"Name: {student_name}\nID: {student_id}")
+        pc.user_name = student_name
+        pc.student_id = student_id
+        pc.session_id = session_id
+        pc.signed_in_at = signed_in_at
+        pc.carried = carried
+        self.active_sessions.setdefault(student_id, set()).add(pc_id)
+
+    def restore_open_sessions(self):
+        # Put back the sessions that were still open when the app last closed.
+        # Versions that freed every PC on restart left sessions open that
+        # nobody could sign out of, some on a PC that has been signed into
+        # since; those are closed when the PC was next signed into. Sessions
+        # on a PC that is no longer in the layout are closed now.
+        now = QDateTime.currentSecsSinceEpoch()
+        restored = {}  # PC number -> (session ID, sign-in Event, carried)
+        for session_id, event, carried in sorted(
+            self.storage.open_sessions(), key=lambda session: session[1].time
+        ):
+            if event.pc_number not in self.pcs:
+                self.storage.log_sign_out(session_id, event._replace(time=now, action=SIGN_OUT))
+                continue
+            if event.pc_number in restored:
+                older_id, older, _ = restored[event.pc_number]
+                self.storage.log_sign_out(
+                    older_id, older._replace(time=event.time, action=SIGN_OUT)
+                )
+            restored[event.pc_number] = (session_id, event, carried)
 
-        if not os.path.exists(club_file):
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Members"
-            ws.append(["Student ID", "Name"])
-            wb.save(club_file)
+        for session_id, event, carried in restored.values():
+            self.mark_pc_in_use(
+                event.pc_number, event.student_id, event.name, session_id, event.time, carried
+            )
 
-        return club_file
+    def schedule_log_rotation(self):
+        now = QDateTime.currentDateTime()
+        midnight = QDateTime(now.date().addDays(1), QTime(0, 0))
+        self.rotation_timer.start(now.msecsTo(midnight) + 1000)
+
+    def rotate_log(self):
+        self.storage.rotate()
+        if QDateTime.currentDateTime().toString("yyyy-MM-dd") != self.events_day:
+            # Sessions still open began on an earlier day and don't count towards
+            # today's session lengths, which start afresh
+            for pc in self.pcs.values():
+                if pc.status == "In Use":
+                    pc.carried = True
+            self.load_events()
+            self.update_wait_estimates()
+            self.statusBar().showMessage("Started a new day's log", 3000)
+        self.schedule_log_rotation()
+
+    def export_to_excel(self):
+        paths = self.storage.export()
+        self.statusBar().showMessage(f"Exporting {', '.join(paths)}", 3000)
+
+    def on_workbook_saved(self, path):
+        self.statusBar().showMessage(f"Saved {path}", 3000)
+
+    def on_workbook_save_failed(self, path, error):
+        # Nothing is lost: the journal or database still has every change
+        self.statusBar().showMessage(f"Could not save {path}: {error}")
 
     def load_club_members(self):
-        self.club_people_list.clear()
-        wb = openpyxl.load_workbook(self.club_file)
-        ws = wb.active
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            self.club_people_list.addItem(f"{row[1]} ({row[0]})")
-        wb.close()
+        self.members = MemberRegistry()
+        self.member_model.set_registry(self.members)
+        self.member_completion_model.set_registry(self.members)
+        self.waitlist_model.set_registry(self.members)
+
+        # Stream the roster in batches; adding and deleting wait until the
+        # whole roster is in
+        self.add_button.setEnabled(False)
+        self.delete_button.setEnabled(False)
+        self.member_chunks = self.storage.iter_members(MEMBER_LOAD_CHUNK_SIZE)
+        QTimer.singleShot(0, self.load_next_member_chunk)
+
+    def filter_members(self, text):
+        if text:
+            self.member_model.fetch_all()
+        self.member_filter_model.setFilterFixedString(text)
+
+    def load_next_member_chunk(self):
+        if self.member_chunks is None:
+            return
+        chunk = next(self.member_chunks, None)
+        if chunk is None:
+            self.member_chunks = None
+            # Sort the search index now rather than on the first keystroke
+            self.members.search_index.sorted_words()
+            self.add_button.setEnabled(True)
+            self.delete_button.setEnabled(True)
+            self.statusBar().showMessage(f"Loaded {len(self.members)} club members", 3000)
+            return
+
+        self.member_model.append(
+            [
+                self.members.add(student_id, name)
+                for student_id, name in chunk
+                if str(student_id) not in self.members
+            ]
+        )
+
+        QTimer.singleShot(0, self.load_next_member_chunk)
 
     def load_events(self):
         current_date = QDateTime.currentDateTime().toString("yyyy-MM-dd")
-        self.people_table.setRowCount(0)
-        wb = openpyxl.load_workbook(self.log_file)
-        ws = wb.active
-
-        events = []  # Store events as tuples for sorting
-
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            sign_in_time = row[2]
-            sign_out_time = row[4]
-            if sign_in_time and sign_in_time.startswith(current_date):
-                events.append((str(row[3]), row[0], "Sign-In", sign_in_time))
-            if sign_out_time and sign_out_time.startswith(current_date):
-                events.append((str(row[3]), row[0], "Sign-Out", sign_out_time))
-
-        wb.close()
-
-        # Sort events by the timestamp (4th item in tuple)
-        events.sort(key=lambda x: QDateTime.fromString(x[3], "yyyy-MM-dd hh:mm:ss"))
-
-        # Insert sorted events into the table
+        self.events_day = current_date
+
+        # Storage hands events back in time order, so there is nothing to sort
+        events = self.storage.load_events(current_date)
+        self.event_model.set_events(events)
+
+        # Session lengths so far today, for estimating waits; sessions
+        # carried over from an earlier day have no sign-in today and are
+        # left out, as they are on sign-out
+        self.sessions_ended = 0
+        self.session_seconds = 0
+        signed_in = {}
         for event in events:
-            row_position = self.people_table.rowCount()
-            self.people_table.insertRow(row_position)
-            for col, value in enumerate(event):
-                self.people_table.setItem(row_position, col, QTableWidgetItem(value))
-
-        # Ensure sorting applies correctly within the table widget
-        self.people_table.sortItems(3, Qt.AscendingOrder)
+            # Keyed by member as well: a session closed on restore can end
+            # after the next one on its PC began
+            key = (event.pc_number, event.student_id)
+            if event.action == SIGN_IN:
+                signed_in[key] = event.time
+            elif key in signed_in:
+                self.sessions_ended += 1
+                self.session_seconds += event.time - signed_in.pop(key)
 
     def add_person(self):
         dialog = QDialog(self)
@@ -385,36 +2110,41 @@ class PCLoungeApp(QMainWindow):
         name = self.name_input.text()
 
         if student_id and name:
-            wb = openpyxl.load_workbook(self.club_file)
-            ws = wb.active
-            ws.append([student_id, name])
-            wb.save(self.club_file)
-            wb.close()
-            self.club_people_list.addItem(f"{name} ({student_id})")
+            if student_id in self.members:
+                QMessageBox.warning(
+                    self,
+                    "Input Error",
+                    f"Student ID {student_id} already belongs to "
+                    f"{self.members.name(student_id)}.",
+                )
+                return
+            self.storage.add_member(student_id, name)
+            self.member_model.append([self.members.add(student_id, name)])
         else:
             QMessageBox.warning(
                 self, "Input Error", "Both Student ID and Name are required."
             )
 
     def delete_person(self):
-        selected_item = self.club_people_list.currentItem()
-        if selected_item:
-            student_id = selected_item.text().split("(")[-1].strip(")")
-            self.remove_person_from_file(student_id)
-            self.club_people_list.takeItem(self.club_people_list.row(selected_item))
-
-    def remove_person_from_file(self, student_id):
-        wb = openpyxl.load_workbook(self.club_file)
-        ws = wb.active
-        rows = list(ws.iter_rows(values_only=True))
-        ws.delete_rows(2, ws.max_row - 1)  # Clear all rows except the header
-
-        for row in rows[1:]:
-            if row[0] != student_id:
-                ws.append(row)
-
-        wb.save(self.club_file)
-        wb.close()
+        selected_indexes = self.club_people_list.selectionModel().selectedIndexes()
+        if selected_indexes:
+            student_ids = [index.data(Qt.UserRole) for index in selected_indexes]
+            self.storage.remove_members(student_ids)
+            for student_id in student_ids:
+                self.members.remove(student_id)
+                self.waitlist_model.remove(student_id)
+            self.member_model.remove(student_ids)
+            self.update_wait_estimates()
+
+    def closeEvent(self, event):
+        if self.member_chunks is not None:
+            self.member_chunks.close()
+            self.member_chunks = None
+
+        # Let the writer finish any pending saves before exiting
+        self.writer.stop()
+        self.storage.close()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
@@ -438,12 +2168,13 @@ if __name__ == "__main__":
         font-size: 14px;
         color: black;
     }
-    QTableWidget {
+    QTableView {
         background-color: black;
         color: white;
         gridline-color: #5a5a5a;
     }
 """
+        + pc_state_stylesheet()
     )
 
     window = PCLoungeApp()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The main window is built in some tests, with nowhere to show it
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qt_app():
+    # The workbook writer is a QThread and the window needs widgets, both of
+    # which want an application object
+    return QApplication.instance() or QApplication([])
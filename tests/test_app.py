@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from PyQt5.QtCore import QDateTime
+
+from pclounge import SIGN_IN, SIGN_OUT, ExcelStorage, PCLoungeApp
+
+
+@pytest.fixture
+def lounge_dir(tmp_path, monkeypatch):
+    # The app keeps its files in the current directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_journal(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def sign_in(session, name, time, pc):
+    return {
+        "op": "sign_in",
+        "session": session,
+        "name": name,
+        "student_id": name.lower(),
+        "time": time,
+        "pc": pc,
+    }
+
+
+def test_older_sessions_left_open_on_a_pc_are_closed_on_restore(lounge_dir):
+    now = QDateTime.currentSecsSinceEpoch()
+    day = QDateTime.currentDateTime().toString("yyyy-MM-dd")
+    # Left behind by a version that freed every PC on restart: X was never
+    # signed out before Y took PC 5, and PC 99 has since left the layout
+    write_journal(
+        ExcelStorage.journal_path(day),
+        [
+            sign_in("x", "X", now - 3600, 5),
+            sign_in("y", "Y", now - 1800, 5),
+            sign_in("z", "Z", now - 600, 99),
+        ],
+    )
+
+    app = PCLoungeApp()
+    try:
+        assert app.pcs[5].student_id == "y"
+        assert app.active_sessions == {"y": {5}}
+        assert [session[0] for session in app.storage.open_sessions()] == ["y"]
+
+        app.toggle_pc_status(5)
+        assert app.pcs[5].status == "Free"
+        assert app.active_sessions == {}
+        assert app.storage.open_sessions() == []
+
+        events = app.event_model.events
+        assert [event.time for event in events] == sorted(event.time for event in events)
+        assert sorted((event.name, event.action) for event in events) == [
+            ("X", SIGN_IN),
+            ("X", SIGN_OUT),
+            ("Y", SIGN_IN),
+            ("Y", SIGN_OUT),
+            ("Z", SIGN_IN),
+            ("Z", SIGN_OUT),
+        ]
+        # X's session ended when Y signed in, Z's when the app started
+        sign_outs = {event.name: event.time for event in events if event.action == SIGN_OUT}
+        assert sign_outs["X"] == now - 1800
+        assert sign_outs["Z"] >= now
+    finally:
+        app.close()
+
+
+def test_sessions_carried_from_an_earlier_day_do_not_count_towards_today(lounge_dir):
+    yesterday = QDateTime.currentDateTime().addDays(-1)
+    write_journal(
+        ExcelStorage.journal_path(yesterday.toString("yyyy-MM-dd")),
+        [sign_in("x", "X", yesterday.toSecsSinceEpoch(), 5)],
+    )
+
+    app = PCLoungeApp()
+    try:
+        assert app.pcs[5].status == "In Use"
+        assert app.pcs[5].carried
+        app.toggle_pc_status(5)
+        assert (app.sessions_ended, app.session_seconds) == (0, 0)
+
+        # The same as rebuilding the counts from the day's events
+        app.load_events()
+        assert (app.sessions_ended, app.session_seconds) == (0, 0)
+    finally:
+        app.close()
@@ -0,0 +1,74 @@
+from pclounge import FreeSeatPool, Seat, fill_front_ranks, spread_out_ranks
+
+
+def grid(rows, columns):
+    return [
+        Seat(row * columns + column + 1, "", "", row, column)
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def test_fill_front_hands_out_seats_in_layout_order():
+    pool = FreeSeatPool(fill_front_ranks(grid(2, 2)))
+    for number in (4, 2, 3, 1):
+        pool.add(number)
+    assert pool.peek() == 1
+    pool.discard(1)
+    assert pool.peek() == 2
+
+
+def test_spread_out_takes_alternate_seats_first():
+    seats = grid(2, 3)
+    pool = FreeSeatPool(spread_out_ranks(seats))
+    for seat in seats:
+        pool.add(seat.number)
+    order = []
+    while pool.peek() is not None:
+        order.append(pool.peek())
+        pool.discard(order[-1])
+    # 1 2 3
+    # 4 5 6
+    assert order == [1, 3, 5, 2, 4, 6]
+
+
+def test_discarded_seats_are_dropped_lazily():
+    pool = FreeSeatPool(fill_front_ranks(grid(1, 3)))
+    for number in (1, 2, 3):
+        pool.add(number)
+    pool.discard(1)
+    pool.discard(2)
+    # Still in the heap until they reach the top
+    assert len(pool.heap) == 3
+    assert len(pool) == 1 and 1 not in pool and 3 in pool
+    assert pool.peek() == 3
+    assert len(pool.heap) == 1
+
+    pool.add(1)
+    assert pool.peek() == 1
+    pool.discard(3)
+    pool.discard(1)
+    assert pool.peek() is None
+    assert len(pool) == 0
+
+
+def test_adding_a_free_seat_twice_is_harmless():
+    pool = FreeSeatPool(fill_front_ranks(grid(1, 2)))
+    pool.add(2)
+    pool.add(2)
+    assert len(pool.heap) == 1
+    pool.discard(2)
+    assert pool.peek() is None
+
+
+def test_heap_is_rebuilt_when_stale_entries_pile_up():
+    pool = FreeSeatPool(fill_front_ranks(grid(1, 2)))
+    pool.add(1)
+    pool.add(2)
+    for _ in range(10):
+        pool.discard(2)
+        pool.add(2)
+    assert len(pool.heap) <= 2 * len(pool.ranks)
+    assert pool.peek() == 1
+    pool.discard(1)
+    assert pool.peek() == 2
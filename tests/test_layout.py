@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from pclounge import Seat, default_layout, load_layout
+
+
+def write_layout(tmp_path, layout):
+    path = tmp_path / "lounge_layout.json"
+    path.write_text(json.dumps(layout))
+    return str(path)
+
+
+def test_missing_layout_file_is_created_with_the_original_room(tmp_path):
+    path = str(tmp_path / "lounge_layout.json")
+    seats = load_layout(path)
+    assert [seat.number for seat in seats] == [16, 15, 14, 11, 12, 13, 10, 9, 8, 5, 6, 7, 4, 3, 2, 1]
+    assert seats[0] == Seat(16, "PC 16", "Lounge", 0, 0)
+    assert seats[11] == Seat(7, "PC 7", "Lounge", 3, 2)
+    assert seats[12] == Seat(4, "PC 4", "Lounge", 4, 0)
+    with open(path) as f:
+        assert json.load(f) == default_layout()
+
+
+def test_pcs_without_a_cell_fill_the_zone_grid_in_order(tmp_path):
+    path = write_layout(
+        tmp_path,
+        {
+            "zones": [
+                {"name": "North", "columns": 2, "pcs": [1, 2, {"number": 3, "label": "N3"}]},
+                {"name": "South", "pcs": [{"number": 4, "row": 5, "column": 1}]},
+            ]
+        },
+    )
+    assert load_layout(path) == [
+        Seat(1, "PC 1", "North", 0, 0),
+        Seat(2, "PC 2", "North", 0, 1),
+        Seat(3, "N3", "North", 1, 0),
+        Seat(4, "PC 4", "South", 5, 1),
+    ]
+
+
+@pytest.mark.parametrize(
+    "zones, message",
+    [
+        ([{"name": "A", "pcs": [1]}], "has no row"),
+        (
+            [{"name": "A", "columns": 2, "pcs": [1]}, {"name": "B", "columns": 2, "pcs": [1]}],
+            "more than once",
+        ),
+        (
+            [
+                {
+                    "name": "A",
+                    "pcs": [
+                        {"number": 1, "row": 0, "column": 0},
+                        {"number": 2, "row": 0, "column": 0},
+                    ],
+                }
+            ],
+            "share row 0, column 0",
+        ),
+    ],
+)
+def test_invalid_layouts_are_rejected(tmp_path, zones, message):
+    path = write_layout(tmp_path, {"zones": zones})
+    with pytest.raises(ValueError, match=message):
+        load_layout(path)
+
+
+def test_same_cell_in_different_zones_is_allowed(tmp_path):
+    path = write_layout(
+        tmp_path,
+        {"zones": [{"name": "A", "columns": 1, "pcs": [1]}, {"name": "B", "columns": 1, "pcs": [2]}]},
+    )
+    assert [(seat.zone, seat.row, seat.column) for seat in load_layout(path)] == [("A", 0, 0), ("B", 0, 0)]
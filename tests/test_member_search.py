@@ -0,0 +1,84 @@
+from pclounge import MemberRegistry
+
+
+def make_registry(members):
+    registry = MemberRegistry()
+    for student_id, name in members:
+        registry.add(student_id, name)
+    return registry
+
+
+def names(registry, student_ids):
+    return [registry.name(student_id) for student_id in student_ids]
+
+
+def test_word_prefix_matches_come_before_matches_inside_words():
+    registry = make_registry(
+        [("1", "Jane Ashton"), ("2", "Ash Ketchum"), ("3", "Sam Nash"), ("4", "Bob Lee")]
+    )
+    assert names(registry, registry.search("ash", 10)) == ["Ash Ketchum", "Jane Ashton", "Sam Nash"]
+
+
+def test_matches_inside_words_are_ranked_by_position_then_text():
+    registry = make_registry([("1", "Bob Cash"), ("2", "Pasha Lee"), ("3", "Dashiell Roy")])
+    assert names(registry, registry.search("ash", 10)) == ["Dashiell Roy", "Pasha Lee", "Bob Cash"]
+
+
+def test_finds_members_by_student_id():
+    registry = make_registry([("301234", "Alice Smith"), ("309999", "Bob Jones")])
+    assert registry.search("3012", 10) == ["301234"]
+    assert registry.search("234", 10) == ["301234"]
+
+
+def test_short_queries_and_limit():
+    registry = make_registry([(str(i), f"Member {i}") for i in range(20)])
+    assert len(registry.search("me", 5)) == 5
+    assert registry.search("", 5) == []
+
+
+def test_fuzzy_finds_short_words_with_one_typo():
+    registry = make_registry([("1", "John Smith"), ("2", "Mary Jones"), ("3", "Eve Brown")])
+    for query, expected in [
+        ("smtih", ["John Smith"]),
+        ("smiht", ["John Smith"]),
+        ("smih", ["John Smith"]),
+        ("jnoes", ["Mary Jones"]),
+        ("jonse", ["Mary Jones"]),
+        ("mary jnoes", ["Mary Jones"]),
+    ]:
+        assert registry.search(query, 10) == []
+        assert names(registry, registry.search(query, 10, fuzzy=True)) == expected
+
+
+def test_fuzzy_does_not_match_two_typos_away():
+    registry = make_registry([("1", "John Smith")])
+    assert registry.search("smyht", 10, fuzzy=True) == []
+
+
+def test_fuzzy_is_only_a_fallback():
+    registry = make_registry([("1", "John Smith"), ("2", "Jo Smyth")])
+    assert names(registry, registry.search("smith", 10, fuzzy=True)) == ["John Smith"]
+
+
+def test_removed_members_are_no_longer_found():
+    registry = make_registry([("1", "John Smith"), ("2", "Jane Smith")])
+    registry.remove("1")
+    assert registry.search("smith", 10) == ["2"]
+    assert registry.search("john", 10, fuzzy=True) == []
+    assert registry.search("smtih", 10, fuzzy=True) == ["2"]
+
+    registry.remove("2")
+    index = registry.search_index
+    assert index.texts == {}
+    assert index.postings == {}
+    assert index.words == []
+    assert index.word_ids == {}
+    assert index.deletions == {}
+
+
+def test_readding_a_member_replaces_the_old_name():
+    registry = make_registry([("1", "John Smith")])
+    registry.add("1", "John Smythe")
+    assert registry.search("smith", 10) == []
+    assert registry.search("smythe", 10) == ["1"]
+    assert registry.find_by_display("John Smythe (1)") == "1"
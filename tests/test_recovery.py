@@ -0,0 +1,163 @@
+import json
+
+import openpyxl
+import pytest
+from openpyxl import Workbook
+from PyQt5.QtCore import QDateTime
+
+from pclounge import (
+    LOG_HEADER,
+    MEMBER_HEADER,
+    SIGN_IN,
+    SIGN_OUT,
+    ExcelStorage,
+    Journal,
+    WorkbookWriter,
+    atomic_save,
+    format_time,
+)
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    # The storage works on files in the current directory
+    monkeypatch.chdir(tmp_path)
+    writer = WorkbookWriter(flush_interval_ms=10)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def write_workbook(path, title, header, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = title
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    atomic_save(wb, path)
+
+
+def read_workbook(path):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    rows = [list(row) for row in wb.active.iter_rows(min_row=2, values_only=True)]
+    wb.close()
+    return rows
+
+
+def write_journal(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_repair_drops_a_partially_written_last_line(tmp_path):
+    path = str(tmp_path / "log.journal")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "add", "student_id": "1", "name": "A"}) + "\n")
+        f.write('{"op": "add", "stud')
+
+    journal = Journal(path)
+    assert journal.replay() == [{"op": "add", "student_id": "1", "name": "A"}]
+
+    # New records start on a line of their own
+    journal.append({"op": "remove", "student_ids": ["1"]})
+    journal.close()
+    assert Journal.read(path) == [
+        {"op": "add", "student_id": "1", "name": "A"},
+        {"op": "remove", "student_ids": ["1"]},
+    ]
+
+
+def test_repair_leaves_a_complete_journal_alone(tmp_path):
+    path = str(tmp_path / "log.journal")
+    write_journal(path, [{"op": "add", "student_id": "1", "name": "A"}])
+    with open(path, "rb") as f:
+        before = f.read()
+    Journal(path).close()
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_roster_changes_left_in_the_journal_are_replayed(writer):
+    write_workbook("Club_Members.xlsx", "Members", MEMBER_HEADER, [["1", "A"], ["2", "B"]])
+    write_journal(
+        "Club_Members.journal",
+        [
+            {"op": "add", "student_id": "3", "name": "C"},
+            {"op": "remove", "student_ids": ["1"]},
+            {"op": "add", "student_id": "2", "name": "B2"},
+        ],
+    )
+
+    storage = ExcelStorage(writer)
+    assert read_workbook("Club_Members.xlsx") == [["2", "B2"], ["3", "C"]]
+    # Everything in the journal is now in the workbook
+    assert Journal.read("Club_Members.journal") == []
+    writer.stop()
+    storage.close()
+
+
+def test_log_workbook_behind_its_journal_is_rebuilt(writer):
+    now = QDateTime.currentSecsSinceEpoch()
+    day = QDateTime.currentDateTime().toString("yyyy-MM-dd")
+    log_file = f"PC_Lounge_Log_{day.replace('-', '')}.xlsx"
+    sign_in = {
+        "op": "sign_in",
+        "session": "a",
+        "name": "A",
+        "student_id": "1",
+        "time": now - 60,
+        "pc": 16,
+    }
+    # The workbook was saved after the first sign-in only
+    write_workbook(log_file, "PC Log", LOG_HEADER, [["A", "1", format_time(now - 60), 16, ""]])
+    write_journal(
+        ExcelStorage.journal_path(day),
+        [
+            sign_in,
+            dict(sign_in, session="b", name="B", student_id="2", pc=15),
+            {"op": "sign_out", "session": "a", "time": now},
+        ],
+    )
+
+    storage = ExcelStorage(writer)
+    writer.stop()
+    storage.close()
+    assert read_workbook(log_file) == [
+        ["A", "1", format_time(now - 60), 16, format_time(now), None],
+        ["B", "2", format_time(now - 60), 15, None, None],
+    ]
+    assert [session[0] for session in storage.open_sessions()] == ["b"]
+
+
+def test_log_workbook_from_before_the_journal_is_imported_in_time_order(writer):
+    now = QDateTime.currentSecsSinceEpoch()
+    day = QDateTime.currentDateTime().toString("yyyy-MM-dd")
+    log_file = f"PC_Lounge_Log_{day.replace('-', '')}.xlsx"
+    write_workbook(
+        log_file,
+        "PC Log",
+        LOG_HEADER[:5],
+        [
+            ["A", "1", format_time(now - 3600), 16, format_time(now - 60)],
+            [None, None, None, None, None],
+            ["B", "2", format_time(now - 1800), 15, ""],
+        ],
+    )
+
+    storage = ExcelStorage(writer)
+    events = storage.load_events(day)
+    assert [(event.time, event.name, event.action) for event in events] == [
+        (now - 3600, "A", SIGN_IN),
+        (now - 1800, "B", SIGN_IN),
+        (now - 60, "A", SIGN_OUT),
+    ]
+    assert [event.name for session_id, event, carried in storage.open_sessions()] == ["B"]
+    writer.stop()
+    storage.close()
+    # The blank row is dropped rather than turned into a session
+    assert read_workbook(log_file) == [
+        ["A", "1", format_time(now - 3600), 16, format_time(now - 60), None],
+        ["B", "2", format_time(now - 1800), 15, None, None],
+    ]
@@ -0,0 +1,178 @@
+import json
+
+import openpyxl
+import pytest
+from PyQt5.QtCore import QDate, QDateTime, QTime
+
+from pclounge import (
+    SIGN_IN,
+    SIGN_OUT,
+    Event,
+    ExcelStorage,
+    SQLiteStorage,
+    WorkbookWriter,
+    format_time,
+)
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    # The storage works on files in the current directory
+    monkeypatch.chdir(tmp_path)
+    writer = WorkbookWriter(flush_interval_ms=10)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def read_workbook(path):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    rows = [list(row) for row in wb.active.iter_rows(min_row=2, values_only=True)]
+    wb.close()
+    return rows
+
+
+def log_file(day):
+    return f"PC_Lounge_Log_{day.toString('yyyyMMdd')}.xlsx"
+
+
+@pytest.fixture
+def left_open_yesterday(writer):
+    # Yesterday's journal, with A still signed in when the app was closed
+    today = QDate.currentDate()
+    yesterday = today.addDays(-1)
+    signed_in = QDateTime(yesterday, QTime(22, 0)).toSecsSinceEpoch()
+    signed_out = QDateTime(yesterday, QTime(22, 30)).toSecsSinceEpoch()
+    records = [
+        {"op": "sign_in", "session": "a", "name": "A", "student_id": "1", "time": signed_in, "pc": 16},
+        {"op": "sign_in", "session": "b", "name": "B", "student_id": "2", "time": signed_in, "pc": 15},
+        {"op": "sign_out", "session": "b", "time": signed_out},
+    ]
+    with open(ExcelStorage.journal_path(yesterday.toString("yyyy-MM-dd")), "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return {
+        "today": today,
+        "yesterday": yesterday,
+        "signed_in": signed_in,
+        "signed_out": signed_out,
+        "midnight": QDateTime(today, QTime(0, 0)).toSecsSinceEpoch(),
+    }
+
+
+def test_open_session_is_split_at_midnight(writer, left_open_yesterday):
+    days = left_open_yesterday
+    storage = ExcelStorage(writer)
+    assert storage.day == days["today"].toString("yyyy-MM-dd")
+    assert storage.open_sessions() == [
+        ("a", Event(days["midnight"], 16, "1", "A", SIGN_IN), True)
+    ]
+    assert storage.load_events(storage.day) == []
+    writer.stop()
+    storage.close()
+
+    # Signed out at midnight in yesterday's log...
+    assert read_workbook(log_file(days["yesterday"])) == [
+        ["A", "1", format_time(days["signed_in"]), 16, format_time(days["midnight"]), None],
+        ["B", "2", format_time(days["signed_in"]), 15, format_time(days["signed_out"]), None],
+    ]
+    # ...and continued from midnight in today's
+    assert read_workbook(log_file(days["today"])) == [
+        ["A", "1", format_time(days["midnight"]), 16, None, "Yes"],
+    ]
+
+
+def test_sign_out_of_a_carried_session_lands_on_todays_row(writer, left_open_yesterday):
+    days = left_open_yesterday
+    now = QDateTime.currentSecsSinceEpoch()
+    storage = ExcelStorage(writer)
+    storage.log_sign_out("a", Event(now, 16, "1", "A", SIGN_OUT))
+    assert storage.open_sessions() == []
+    assert storage.load_events(storage.day) == [Event(now, 16, "1", "A", SIGN_OUT)]
+    writer.stop()
+    storage.close()
+
+    assert read_workbook(log_file(days["yesterday"]))[0][4] == format_time(days["midnight"])
+    assert read_workbook(log_file(days["today"])) == [
+        ["A", "1", format_time(days["midnight"]), 16, format_time(now), "Yes"],
+    ]
+
+
+def test_restarting_later_the_same_day_does_not_carry_sessions_again(
+    writer, left_open_yesterday
+):
+    days = left_open_yesterday
+    storage = ExcelStorage(writer)
+    writer.stop()
+    storage.close()
+
+    restarted = WorkbookWriter(flush_interval_ms=10)
+    restarted.start()
+    storage = ExcelStorage(restarted)
+    assert [session[0] for session in storage.open_sessions()] == ["a"]
+    restarted.stop()
+    storage.close()
+    assert read_workbook(log_file(days["today"])) == [
+        ["A", "1", format_time(days["midnight"]), 16, None, "Yes"],
+    ]
+
+
+@pytest.fixture
+def database(writer, tmp_path):
+    storage = SQLiteStorage(writer, str(tmp_path / "pclounge.db"))
+    yield storage
+    storage.close()
+
+
+def at(day, hour, minute=0):
+    return QDateTime(day, QTime(hour, minute)).toSecsSinceEpoch()
+
+
+def test_sqlite_sign_in_and_sign_out_round_trip(database):
+    day = QDate.currentDate()
+    sign_in = Event(at(day, 10, 15), 7, "1", "A", SIGN_IN)
+    session_id = database.log_sign_in(sign_in)
+    assert database.open_sessions() == [(session_id, sign_in, False)]
+
+    sign_out = Event(at(day, 11, 45), 7, "1", "A", SIGN_OUT)
+    database.log_sign_out(session_id, sign_out)
+    assert database.open_sessions() == []
+    # Stored as local time text and turned back into the same epoch seconds
+    assert database.load_events(day.toString("yyyy-MM-dd")) == [sign_in, sign_out]
+
+
+def test_sqlite_load_events_merges_the_days_sign_ins_and_outs_by_time(database):
+    today = QDate.currentDate()
+    yesterday = today.addDays(-1)
+    overnight = database.log_sign_in(Event(at(yesterday, 23), 1, "1", "A", SIGN_IN))
+    first = database.log_sign_in(Event(at(today, 9), 2, "2", "B", SIGN_IN))
+    second = database.log_sign_in(Event(at(today, 10), 3, "3", "C", SIGN_IN))
+    database.log_sign_out(second, Event(at(today, 11), 3, "3", "C", SIGN_OUT))
+    database.log_sign_out(overnight, Event(at(today, 12), 1, "1", "A", SIGN_OUT))
+    database.log_sign_out(first, Event(at(today, 13), 2, "2", "B", SIGN_OUT))
+
+    assert database.load_events(today.toString("yyyy-MM-dd")) == [
+        Event(at(today, 9), 2, "2", "B", SIGN_IN),
+        Event(at(today, 10), 3, "3", "C", SIGN_IN),
+        Event(at(today, 11), 3, "3", "C", SIGN_OUT),
+        Event(at(today, 12), 1, "1", "A", SIGN_OUT),
+        Event(at(today, 13), 2, "2", "B", SIGN_OUT),
+    ]
+    assert database.load_events(yesterday.toString("yyyy-MM-dd")) == [
+        Event(at(yesterday, 23), 1, "1", "A", SIGN_IN),
+    ]
+
+
+def test_sqlite_open_sessions_are_those_not_signed_out(database):
+    today = QDate.currentDate()
+    yesterday = today.addDays(-1)
+    overnight = database.log_sign_in(Event(at(yesterday, 23), 1, "1", "A", SIGN_IN))
+    closed = database.log_sign_in(Event(at(today, 9), 2, "2", "B", SIGN_IN))
+    still_open = database.log_sign_in(Event(at(today, 10), 3, "3", "C", SIGN_IN))
+    database.log_sign_out(closed, Event(at(today, 11), 2, "2", "B", SIGN_OUT))
+
+    # Oldest first; carried for the one signed in before today
+    assert database.open_sessions() == [
+        (overnight, Event(at(yesterday, 23), 1, "1", "A", SIGN_IN), True),
+        (still_open, Event(at(today, 10), 3, "3", "C", SIGN_IN), False),
+    ]
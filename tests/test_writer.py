@@ -0,0 +1,41 @@
+import openpyxl
+from PyQt5.QtCore import Qt
+
+from pclounge import WorkbookWriter
+
+
+def test_a_bad_operation_is_reported_and_the_writer_keeps_going(tmp_path):
+    path = str(tmp_path / "sheet.xlsx")
+    failures = []
+    writer = WorkbookWriter(flush_interval_ms=10)
+    # Direct, since the test has no event loop to deliver queued signals
+    writer.failed.connect(lambda path, error: failures.append(path), Qt.DirectConnection)
+    writer.start()
+
+    # Never opened
+    writer.set_cell(path, "a", 0, "x")
+    writer.flush()
+    writer.open_sheet(path, "Sheet", ["Key"], {"a": ["a"]})
+    writer.append_row(path, "b", ["b"])
+    writer.stop()
+
+    assert failures == [path]
+    assert writer.isFinished()
+    wb = openpyxl.load_workbook(path, read_only=True)
+    assert [list(row) for row in wb.active.iter_rows(values_only=True)] == [["Key"], ["a"], ["b"]]
+    wb.close()
+
+
+def test_rows_are_copied_when_a_sheet_is_opened(tmp_path):
+    path = str(tmp_path / "sheet.xlsx")
+    rows = {"a": ["a", ""]}
+    writer = WorkbookWriter(flush_interval_ms=10)
+    writer.start()
+    writer.open_sheet(path, "Sheet", ["Key", "Value"], rows)
+    # The caller keeps changing its own rows afterwards
+    rows["a"][1] = "changed"
+    writer.stop()
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    assert [list(row) for row in wb.active.iter_rows(min_row=2, values_only=True)] == [["a", None]]
+    wb.close()